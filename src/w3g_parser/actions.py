@@ -1,11 +1,20 @@
 """Action parsing for W3G replay files."""
 
 import struct
+import sys
 import logging
-from typing import Iterator
+from collections.abc import Callable
+from functools import lru_cache
+from typing import Any
 
 logger = logging.getLogger(__name__)
 
+# Precompiled unpackers for the fixed-width fields read on every action
+_U16 = struct.Struct("<H").unpack_from
+_U32 = struct.Struct("<I").unpack_from
+_U32_PAIR = struct.Struct("<II").unpack_from
+_F32_PAIR = struct.Struct("<ff").unpack_from
+
 
 # Common ability/item ID mappings (4-char codes reversed)
 ITEM_ID_NAMES: dict[str, str] = {
@@ -167,6 +176,31 @@ ITEM_ID_NAMES: dict[str, str] = {
     "Ucrl": "Crypt Lord",
 }
 
+# Decoded names are handed out for every matching action; interning keeps them
+# identical objects, so downstream comparisons can short-circuit on identity
+ITEM_ID_NAMES = {key: sys.intern(name) for key, name in ITEM_ID_NAMES.items()}
+
+
+# Bytes allowed in string IDs: ASCII letters, digits, '_' and null padding
+_ITEM_ID_CHARS = (
+    b"0123456789ABCDEFGHIJKLMNOPQRSTUVWXYZabcdefghijklmnopqrstuvwxyz_\x00"
+)
+
+# ITEM_ID_NAMES split by ID format and keyed the way IDs appear in the data:
+# string IDs by their reversed, null-padded bytes and numeric IDs by number
+_ITEM_ID_BYTES: dict[bytes, str] = {
+    key.encode("ascii")[::-1].ljust(4, b"\x00"): name
+    for key, name in ITEM_ID_NAMES.items()
+    if not key.startswith("ability_")
+    and len(key) <= 4
+    and not key.encode("ascii").translate(None, _ITEM_ID_CHARS)
+}
+_ABILITY_NUM_NAMES: dict[int, str] = {
+    int(key[len("ability_"):]): name
+    for key, name in ITEM_ID_NAMES.items()
+    if key.startswith("ability_")
+}
+
 
 def decode_item_id(item_bytes: bytes) -> str:
     """Decode a 4-byte item/ability ID to human-readable string.
@@ -183,22 +217,29 @@ def decode_item_id(item_bytes: bytes) -> str:
     """
     if len(item_bytes) != 4:
         return item_bytes.hex()
+    return _decode_4byte_item_id(bytes(item_bytes))
+
 
+# The ID space seen in replays is small and IDs repeat constantly, so the
+# cache ends up holding practically every distinct ID after warmup
+@lru_cache(maxsize=4096)
+def _decode_4byte_item_id(item_bytes: bytes) -> str:
+    """Decode a 4-byte item/ability ID (see decode_item_id)."""
     # Check if numeric ID (XX XX 0D 00)
     if item_bytes[2:4] == b'\x0d\x00':
-        ability_num = struct.unpack('<H', item_bytes[0:2])[0]
-        key = f"ability_{ability_num}"
-        return ITEM_ID_NAMES.get(key, key)
-
-    # Try to decode as string ID
-    try:
-        s = item_bytes.decode('ascii')
-        if all(c.isalnum() or c in '_\x00' for c in s):
-            # Reverse the string (WC3 stores them backwards)
-            code = s.rstrip('\x00')[::-1]
-            return ITEM_ID_NAMES.get(code, code)
-    except (UnicodeDecodeError, ValueError):
-        pass
+        ability_num = _U16(item_bytes, 0)[0]
+        name = _ABILITY_NUM_NAMES.get(ability_num)
+        return name if name is not None else f"ability_{ability_num}"
+
+    name = _ITEM_ID_BYTES.get(item_bytes)
+    if name is not None:
+        return name
+
+    # String ID if nothing is left once the allowed bytes are deleted
+    if not item_bytes.translate(None, _ITEM_ID_CHARS):
+        # Reverse the string (WC3 stores them backwards)
+        code = item_bytes.rstrip(b'\x00')[::-1].decode('ascii')
+        return ITEM_ID_NAMES.get(code, code)
 
     return item_bytes.hex()
 
@@ -274,8 +315,392 @@ ACTION_NAMES: dict[int, str] = {
     ACTION_UNKNOWN_75: "unknown_75",
 }
 
-# Cheat action IDs (single player only)
-CHEAT_ACTIONS = set(range(0x20, 0x33))
+# Cheat action IDs (single player only); a contiguous range, so membership is
+# two integer comparisons instead of a hash lookup
+CHEAT_ACTIONS = range(0x20, 0x33)
+
+# Bookkeeping actions that rarely matter for analysis; parse_command_data can
+# skip them without building a GameAction
+_IGNORED_ACTIONS: frozenset[int] = frozenset(
+    {
+        ACTION_PRE_SUBSELECTION,
+        ACTION_UNKNOWN_1B,
+        ACTION_UNKNOWN_75,
+        ACTION_HERO_SKILL_MENU,
+        ACTION_BUILDING_MENU,
+        ACTION_SAVE_FINISHED,
+        ACTION_SCENARIO_TRIGGER,
+        ACTION_CONTINUE_GAME_A,
+        ACTION_CONTINUE_GAME_B,
+        ACTION_ESC_PRESSED,
+        *CHEAT_ACTIONS,
+    }
+)
+
+# Action names indexed by action ID, so lookups need no hashing or fallback.
+# Interned so every action of a type shares one name object, including the
+# generated names of unknown IDs.
+_ACTION_NAME_TABLE: tuple[str, ...] = tuple(
+    sys.intern("cheat" if i in CHEAT_ACTIONS else ACTION_NAMES.get(i, f"unknown_{i:02x}"))
+    for i in range(256)
+)
+
+# Action handlers
+#
+# Each handler receives the data and the offset just past the action ID byte,
+# and returns a tuple of (parsed fields or None, new offset). Handlers are
+# looked up through a 256-entry table indexed by action ID, so dispatch costs
+# a single index instead of an if/elif walk. Layouts that depend on the game
+# version get one table per version range, picked once per command block.
+#
+# Table entries pair each handler with the number of bytes it needs. That is
+# checked once before the call, and an action with fewer bytes left is kept
+# without fields, consuming only its ID byte. Handlers can therefore read
+# their fixed-size fields without bounds checks and never raise.
+#
+# Fixed-size actions without parsed fields have no handler at all: their
+# entry is (None, size) and the parser just steps over `size` bytes, which
+# may run past the end of the data and so end the action block.
+
+ActionHandler = Callable[[bytes, int], tuple[dict[str, Any] | None, int]]
+ActionEntry = tuple[ActionHandler | None, int]
+
+
+# Decoded action strings by raw bytes. Trigger commands and save names repeat
+# a lot in scripted maps, so they are decoded once; the cap bounds memory
+# for replays full of distinct strings.
+_DECODE_CACHE_SIZE = 4096
+_decode_cache: dict[bytes, str] = {}
+
+
+def _read_cstring(data: bytes, offset: int) -> tuple[str, int]:
+    """Read a null-terminated UTF-8 string.
+
+    Returns:
+        Tuple of (decoded string, offset just past the null terminator)
+    """
+    end = data.find(b"\x00", offset)
+    if end < 0:
+        # Unterminated: the string runs to the end of the data
+        end = max(offset, len(data))
+    raw = bytes(data[offset:end])
+    text = _decode_cache.get(raw)
+    if text is None:
+        text = raw.decode("ascii") if raw.isascii() else raw.decode("utf-8", "replace")
+        if len(_decode_cache) < _DECODE_CACHE_SIZE:
+            _decode_cache[raw] = text
+    return text, end + 1
+
+
+def _handle_set_speed(data: bytes, offset: int) -> tuple[dict[str, Any] | None, int]:
+    return {"speed": data[offset]}, offset + 1
+
+
+def _handle_save_game(data: bytes, offset: int) -> tuple[dict[str, Any] | None, int]:
+    # Variable: null-terminated filename
+    filename, offset = _read_cstring(data, offset)
+    return {"filename": filename}, offset
+
+
+def _ability_handlers(flags_size: int) -> tuple[ActionEntry, ...]:
+    """Build the ability handlers for one AbilityFlags width.
+
+    AbilityFlags is 1 word for v1.13+ and 1 byte for older versions. Every
+    size and field offset of the ability actions follows from that width, so
+    they are baked into the handlers once per table instead of being
+    recomputed from the version on every action.
+
+    Args:
+        flags_size: Size of the AbilityFlags field in bytes (1 or 2)
+
+    Returns:
+        Tuple of dispatch entries for (no params, target position, position
+        and object, drop item, two positions)
+    """
+    # Action sizes, excluding the action ID byte
+    no_params_size = flags_size + 11
+    # flags + item_id(4) + unknown(8) + x(4) + y(4), only 1 byte less is required
+    target_pos_size = flags_size + 20
+    target_pos_min_size = target_pos_size - 1
+    # ... + obj1(4) + obj2(4), but observed payloads are shorter, so only the
+    # coordinates and 3 more bytes are required and object IDs are optional
+    pos_object_min_size = flags_size + 23
+    drop_item_size = flags_size + 34
+    two_pos_size = flags_size + 39
+
+    # AbilityFlags and ItemID, optionally followed by unknowns and coordinates
+    flags_format = "<H" if flags_size == 2 else "<B"
+    read_flags_item = struct.Struct(flags_format + "4s").unpack_from
+    read_flags_item_pos = struct.Struct(flags_format + "4s8xff").unpack_from
+    read_flags_item_pos_objects = struct.Struct(flags_format + "4s8xff4s4s").unpack_from
+
+    def handle_no_params(data: bytes, offset: int) -> tuple[dict[str, Any] | None, int]:
+        ability_flags, item_id = read_flags_item(data, offset)
+        return {"ability_flags": ability_flags, "item_id": item_id}, offset + no_params_size
+
+    def handle_target_pos(data: bytes, offset: int) -> tuple[dict[str, Any] | None, int]:
+        end = offset + target_pos_size
+        if end > len(data):
+            # Coordinates cut short
+            ability_flags, item_id = read_flags_item(data, offset)
+            return {"ability_flags": ability_flags, "item_id": item_id}, end
+        ability_flags, item_id, x, y = read_flags_item_pos(data, offset)
+        action_data = {
+            "ability_flags": ability_flags,
+            "item_id": item_id,
+            "target_x": x,
+            "target_y": y,
+        }
+        return action_data, end
+
+    def handle_pos_object(data: bytes, offset: int) -> tuple[dict[str, Any] | None, int]:
+        # Object IDs follow the coordinates and are read as far as they fit
+        objects_offset = offset + target_pos_size
+        available = len(data) - objects_offset
+        if available >= 8:
+            ability_flags, item_id, x, y, object_id_1, object_id_2 = read_flags_item_pos_objects(
+                data, offset
+            )
+            action_data = {
+                "ability_flags": ability_flags,
+                "item_id": item_id,
+                "target_x": x,
+                "target_y": y,
+                "object_id_1": object_id_1,
+                "object_id_2": object_id_2,
+            }
+            return action_data, objects_offset + 8
+        ability_flags, item_id, x, y = read_flags_item_pos(data, offset)
+        action_data = {
+            "ability_flags": ability_flags,
+            "item_id": item_id,
+            "target_x": x,
+            "target_y": y,
+        }
+        if available >= 4:
+            action_data["object_id_1"] = bytes(data[objects_offset : objects_offset + 4])
+            return action_data, objects_offset + 4
+        return action_data, objects_offset
+
+    return (
+        (handle_no_params, no_params_size),
+        (handle_target_pos, target_pos_min_size),
+        (handle_pos_object, pos_object_min_size),
+        (None, drop_item_size),
+        (None, two_pos_size),
+    )
+
+
+# Object ID lists of selection actions are decoded without a per-unit loop:
+# a precompiled struct per count for usual selection sizes, and a strided
+# dword view for anything larger. Each unit is 2 dwords and only the first
+# one is kept.
+_MAX_PRECOMPILED_UNITS = 24
+_OBJECT_ID_UNPACKERS = tuple(
+    struct.Struct("<" + "I4x" * count).unpack_from for count in range(_MAX_PRECOMPILED_UNITS + 1)
+)
+_ITER_OBJECT_ID_PAIRS = struct.Struct("<II").iter_unpack
+# Native dword views match the little-endian data only on little-endian hosts
+_NATIVE_LITTLE_ENDIAN = sys.byteorder == "little" and struct.calcsize("I") == 4
+
+
+def _parse_object_ids(data: bytes, offset: int, unit_count: int) -> tuple[list[int], int]:
+    """Read up to `unit_count` object IDs (2 dwords per unit, first one kept)."""
+    # Only units that fit entirely in the data are read
+    count = min(unit_count, (len(data) - offset) // 8)
+    end = offset + 8 * count
+    if count <= _MAX_PRECOMPILED_UNITS:
+        return list(_OBJECT_ID_UNPACKERS[count](data, offset)), end
+    with memoryview(data) as view:
+        # Sub-views, so large selections are never copied out of the block
+        units = view[offset:end]
+        if _NATIVE_LITTLE_ENDIAN:
+            return units.cast("I")[::2].tolist(), end
+        return [obj_id for obj_id, _ in _ITER_OBJECT_ID_PAIRS(units)], end
+
+
+def _handle_change_selection(data: bytes, offset: int) -> tuple[dict[str, Any] | None, int]:
+    # 1 byte: select mode (1=add, 2=remove)
+    # 1 word: unit count
+    # n * 8 bytes: object IDs (2 dwords per unit)
+    select_mode = data[offset]
+    unit_count = _U16(data, offset + 1)[0]
+    object_ids, offset = _parse_object_ids(data, offset + 3, unit_count)
+    action_data = {
+        "select_mode": select_mode,
+        "unit_count": unit_count,
+        "object_ids": object_ids,
+    }
+    return action_data, offset
+
+
+def _handle_assign_group(data: bytes, offset: int) -> tuple[dict[str, Any] | None, int]:
+    # 1 byte: group number
+    # 1 word: unit count
+    # n * 8 bytes: object IDs (2 dwords per unit)
+    group = data[offset]
+    unit_count = _U16(data, offset + 1)[0]
+    object_ids, offset = _parse_object_ids(data, offset + 3, unit_count)
+    action_data = {
+        "group": group,
+        "unit_count": unit_count,
+        "object_ids": object_ids,
+    }
+    return action_data, offset
+
+
+def _handle_select_group(data: bytes, offset: int) -> tuple[dict[str, Any] | None, int]:
+    # 1 byte: group number
+    # 1 byte: unknown
+    return {"group": data[offset]}, offset + 2
+
+
+def _handle_unknown_1b(data: bytes, offset: int) -> tuple[dict[str, Any] | None, int]:
+    # Sync/selection verification action (10 bytes total)
+    # 1 byte: flag (always 0x01)
+    # 4 bytes: ObjectID1
+    # 4 bytes: ObjectID2 (usually same as ObjectID1)
+    if offset + 9 > len(data):
+        return None, offset + 9
+    object_id_1, object_id_2 = _U32_PAIR(data, offset + 1)
+    action_data = {
+        "flag": data[offset],
+        "object_id_1": object_id_1,
+        "object_id_2": object_id_2,
+    }
+    return action_data, offset + 9
+
+
+def _handle_remove_from_queue(data: bytes, offset: int) -> tuple[dict[str, Any] | None, int]:
+    # 1 byte: slot number
+    # 4 bytes: ItemID
+    action_data = {
+        "slot": data[offset],
+        "item_id": bytes(data[offset + 1 : offset + 5]),
+    }
+    return action_data, offset + 5
+
+
+def _handle_ally_options(data: bytes, offset: int) -> tuple[dict[str, Any] | None, int]:
+    # 1 byte: player slot
+    # 4 bytes: flags
+    action_data = {
+        "player_slot": data[offset],
+        "flags": _U32(data, offset + 1)[0],
+    }
+    return action_data, offset + 5
+
+
+def _handle_transfer_resources(data: bytes, offset: int) -> tuple[dict[str, Any] | None, int]:
+    # 1 byte: player slot
+    # 4 bytes: gold
+    # 4 bytes: lumber
+    gold, lumber = _U32_PAIR(data, offset + 1)
+    action_data = {
+        "player_slot": data[offset],
+        "gold": gold,
+        "lumber": lumber,
+    }
+    return action_data, offset + 9
+
+
+def _handle_trigger_command(data: bytes, offset: int) -> tuple[dict[str, Any] | None, int]:
+    # Skip 8 bytes of unknowns, then null-terminated string
+    command, offset = _read_cstring(data, offset + 8)
+    return {"command": command}, offset
+
+
+def _handle_minimap_signal(data: bytes, offset: int) -> tuple[dict[str, Any] | None, int]:
+    x, y = _F32_PAIR(data, offset)
+    return {"x": x, "y": y}, offset + 12
+
+
+def _handle_cheat(data: bytes, offset: int) -> tuple[dict[str, Any] | None, int]:
+    # Skip cheat actions (single player)
+    # Most are 1 byte, some are up to 6
+    # Simple heuristic: skip a few bytes
+    return None, offset + min(5, len(data) - offset)
+
+
+def _build_handlers(version: int) -> tuple[ActionEntry | None, ...]:
+    """Build the dispatch table for actions recorded by `version`.
+
+    Args:
+        version: Game version for format differences
+
+    Returns:
+        Tuple of 256 (handler, required bytes) or (None, fixed size) entries
+        indexed by action ID; None marks an unknown action
+    """
+    handlers: list[ActionEntry | None] = [None] * 256
+
+    for action_id in (
+        ACTION_PAUSE,
+        ACTION_RESUME,
+        ACTION_INC_SPEED,
+        ACTION_DEC_SPEED,
+        ACTION_PRE_SUBSELECTION,
+        ACTION_ESC_PRESSED,
+        ACTION_HERO_SKILL_MENU,
+        ACTION_BUILDING_MENU,
+    ):
+        handlers[action_id] = (None, 0)  # 1 byte total
+
+    for action_id in CHEAT_ACTIONS:
+        handlers[action_id] = (_handle_cheat, 0)
+
+    (
+        handlers[ACTION_ABILITY_NO_PARAMS],
+        handlers[ACTION_ABILITY_TARGET_POS],
+        handlers[ACTION_ABILITY_POS_OBJECT],
+        handlers[ACTION_ABILITY_DROP_ITEM],
+        handlers[ACTION_ABILITY_TWO_POS],
+    ) = _ability_handlers(2 if version >= 13 else 1)
+
+    if version >= 14:  # 1.14b+
+        # ItemID (4) + ObjectID1 (4) + ObjectID2 (4)
+        handlers[ACTION_SELECT_SUBGROUP] = (None, 12)
+    else:
+        # Just subgroup number (1 byte)
+        handlers[ACTION_SELECT_SUBGROUP] = (None, 1)
+
+    # Strings don't need any bytes up front: they may run past the end of the
+    # data, which ends the action block
+    handlers[ACTION_SET_SPEED] = (_handle_set_speed, 1)
+    handlers[ACTION_SAVE_GAME] = (_handle_save_game, 0)
+    handlers[ACTION_SAVE_FINISHED] = (None, 4)  # Unknown dword
+    handlers[ACTION_CHANGE_SELECTION] = (_handle_change_selection, 3)
+    handlers[ACTION_ASSIGN_GROUP] = (_handle_assign_group, 3)
+    handlers[ACTION_SELECT_GROUP] = (_handle_select_group, 2)
+    handlers[ACTION_UNKNOWN_1B] = (_handle_unknown_1b, 0)  # Checks its own size
+    handlers[ACTION_SELECT_GROUND_ITEM] = (None, 9)  # 1 byte flags + 2x ObjectID
+    handlers[ACTION_CANCEL_HERO_REVIVAL] = (None, 8)  # 2x UnitID
+    handlers[ACTION_REMOVE_FROM_QUEUE] = (_handle_remove_from_queue, 5)
+    handlers[ACTION_ALLY_OPTIONS] = (_handle_ally_options, 5)
+    handlers[ACTION_TRANSFER_RESOURCES] = (_handle_transfer_resources, 9)
+    handlers[ACTION_TRIGGER_COMMAND] = (_handle_trigger_command, 0)
+    handlers[ACTION_SCENARIO_TRIGGER] = (None, 12)
+    handlers[ACTION_MINIMAP_SIGNAL] = (_handle_minimap_signal, 12)
+    handlers[ACTION_CONTINUE_GAME_B] = (None, 16)
+    handlers[ACTION_CONTINUE_GAME_A] = (None, 16)
+    handlers[ACTION_UNKNOWN_75] = (None, 1)
+    # Frozen so the shared module-level tables can't be changed by accident
+    return tuple(handlers)
+
+
+# Dispatch tables for each range of versions with a distinct action layout
+_HANDLERS_V12 = _build_handlers(12)  # 1-byte AbilityFlags
+_HANDLERS_V13 = _build_handlers(13)  # 1-word AbilityFlags
+_HANDLERS_V14PLUS = _build_handlers(14)  # ... and 12-byte subgroup selection
+
+
+def _handlers_for_version(version: int) -> tuple[ActionEntry | None, ...]:
+    """Return the dispatch table for actions recorded by `version`."""
+    if version >= 14:
+        return _HANDLERS_V14PLUS
+    if version >= 13:
+        return _HANDLERS_V13
+    return _HANDLERS_V12
 
 
 def parse_action(
@@ -283,8 +708,12 @@ def parse_action(
 ) -> tuple[GameAction | None, int]:
     """Parse a single action from action block data.
 
+    Fields kept on the returned action (payload, item and object IDs) are
+    always immutable ``bytes``, so ``data`` may also be a ``bytearray``
+    (e.g. a preallocated decompression buffer) without aliasing it.
+
     Args:
-        data: Action block data
+        data: Action block data (``bytes`` or ``bytearray``)
         offset: Starting offset
         version: Game version for format differences
 
@@ -298,295 +727,44 @@ def parse_action(
     start_offset = offset
     offset += 1
 
-    action_name = ACTION_NAMES.get(action_id, f"unknown_{action_id:02x}")
-    action_data: dict = {}
-
-    try:
-        if action_id == ACTION_PAUSE:
-            pass  # 1 byte total
-
-        elif action_id == ACTION_RESUME:
-            pass  # 1 byte total
-
-        elif action_id == ACTION_SET_SPEED:
-            if offset < len(data):
-                action_data["speed"] = data[offset]
-                offset += 1
-
-        elif action_id in (ACTION_INC_SPEED, ACTION_DEC_SPEED):
-            pass  # 1 byte total
-
-        elif action_id == ACTION_SAVE_GAME:
-            # Variable: null-terminated filename
-            name_start = offset
-            while offset < len(data) and data[offset] != 0:
-                offset += 1
-            action_data["filename"] = data[name_start:offset].decode("utf-8", errors="replace")
-            offset += 1  # Skip null
-
-        elif action_id == ACTION_SAVE_FINISHED:
-            offset += 4  # Unknown dword
-
-        elif action_id == ACTION_ABILITY_NO_PARAMS:
-            # AbilityFlags (1 word for v1.13+, 1 byte for older)
-            # ItemID (4 bytes)
-            # Unknown data
-            if version >= 13:
-                action_size = 14  # 1 (id) + 2 (flags) + 4 (item) + 8 (unknowns)
-            else:
-                action_size = 13
-            if offset + action_size - 1 <= len(data):
-                flags_size = 2 if version >= 13 else 1
-                action_data["ability_flags"] = int.from_bytes(
-                    data[offset : offset + flags_size], "little"
-                )
-                offset += flags_size
-                action_data["item_id"] = data[offset : offset + 4]
-                offset += action_size - 1 - flags_size
-
-        elif action_id == ACTION_ABILITY_TARGET_POS:
-            # Structure: flags(2) + item_id(4) + unknown(8) + x(4) + y(4) = 22 bytes
-            if version >= 13:
-                action_size = 22
-            else:
-                action_size = 21
-            if offset + action_size - 1 <= len(data):
-                flags_size = 2 if version >= 13 else 1
-                action_data["ability_flags"] = int.from_bytes(
-                    data[offset : offset + flags_size], "little"
-                )
-                offset += flags_size
-                action_data["item_id"] = data[offset : offset + 4]
-                offset += 4
-                # Skip unknowns (8 bytes) and read coordinates
-                offset += 8  # unknowns
-                if offset + 8 <= len(data):
-                    x, y = struct.unpack_from("<ff", data, offset)
-                    action_data["target_x"] = x
-                    action_data["target_y"] = y
-                offset += 8
-
-        elif action_id == ACTION_ABILITY_POS_OBJECT:
-            # Structure: flags(2) + item_id(4) + unknown(8) + x(4) + y(4) + obj1(4) + obj2(4) = 30
-            # But observed payloads are 27 bytes, so structure may vary
-            if version >= 13:
-                action_size = 26  # Adjusted based on actual payload
-            else:
-                action_size = 25
-            if offset + action_size - 1 <= len(data):
-                flags_size = 2 if version >= 13 else 1
-                action_data["ability_flags"] = int.from_bytes(
-                    data[offset : offset + flags_size], "little"
-                )
-                offset += flags_size
-                action_data["item_id"] = data[offset : offset + 4]
-                offset += 4
-                offset += 8  # unknowns (8 bytes)
-                if offset + 8 <= len(data):
-                    x, y = struct.unpack_from("<ff", data, offset)
-                    action_data["target_x"] = x
-                    action_data["target_y"] = y
-                offset += 8
-                # Object IDs
-                if offset + 4 <= len(data):
-                    action_data["object_id_1"] = data[offset : offset + 4]
-                    offset += 4
-                if offset + 4 <= len(data):
-                    action_data["object_id_2"] = data[offset : offset + 4]
-                    offset += 4
-
-        elif action_id == ACTION_ABILITY_DROP_ITEM:
-            if version >= 13:
-                action_size = 37
-            else:
-                action_size = 36
-            offset += action_size - 1
-
-        elif action_id == ACTION_ABILITY_TWO_POS:
-            if version >= 13:
-                action_size = 42
-            else:
-                action_size = 41
-            offset += action_size - 1
-
-        elif action_id == ACTION_CHANGE_SELECTION:
-            # 1 byte: select mode (1=add, 2=remove)
-            # 1 word: unit count
-            # n * 8 bytes: object IDs (2 dwords per unit)
-            if offset + 3 <= len(data):
-                action_data["select_mode"] = data[offset]
-                offset += 1
-                unit_count = struct.unpack_from("<H", data, offset)[0]
-                offset += 2
-                action_data["unit_count"] = unit_count
-                # Parse object IDs
-                object_ids = []
-                for _ in range(unit_count):
-                    if offset + 8 <= len(data):
-                        obj_id = struct.unpack_from("<I", data, offset)[0]
-                        object_ids.append(obj_id)
-                        offset += 8  # Skip both dwords (obj_id1 and obj_id2)
-                    else:
-                        break
-                action_data["object_ids"] = object_ids
-
-        elif action_id == ACTION_ASSIGN_GROUP:
-            # 1 byte: group number
-            # 1 word: unit count
-            # n * 8 bytes: object IDs (2 dwords per unit)
-            if offset + 3 <= len(data):
-                action_data["group"] = data[offset]
-                offset += 1
-                unit_count = struct.unpack_from("<H", data, offset)[0]
-                offset += 2
-                action_data["unit_count"] = unit_count
-                # Parse object IDs
-                object_ids = []
-                for _ in range(unit_count):
-                    if offset + 8 <= len(data):
-                        obj_id = struct.unpack_from("<I", data, offset)[0]
-                        object_ids.append(obj_id)
-                        offset += 8
-                    else:
-                        break
-                action_data["object_ids"] = object_ids
-
-        elif action_id == ACTION_SELECT_GROUP:
-            # 1 byte: group number
-            # 1 byte: unknown
-            if offset + 2 <= len(data):
-                action_data["group"] = data[offset]
-                offset += 2
-
-        elif action_id == ACTION_SELECT_SUBGROUP:
-            # Variable based on version
-            if version >= 14:  # 1.14b+
-                # ItemID (4) + ObjectID1 (4) + ObjectID2 (4)
-                offset += 12
-            else:
-                # Just subgroup number (1 byte)
-                offset += 1
-
-        elif action_id == ACTION_PRE_SUBSELECTION:
-            pass  # 1 byte total
-
-        elif action_id == ACTION_UNKNOWN_1B:
-            # Sync/selection verification action (10 bytes total)
-            # 1 byte: flag (always 0x01)
-            # 4 bytes: ObjectID1
-            # 4 bytes: ObjectID2 (usually same as ObjectID1)
-            if offset + 9 <= len(data):
-                action_data["flag"] = data[offset]
-                offset += 1
-                action_data["object_id_1"] = struct.unpack_from("<I", data, offset)[0]
-                offset += 4
-                action_data["object_id_2"] = struct.unpack_from("<I", data, offset)[0]
-                offset += 4
-            else:
-                offset += 9
-
-        elif action_id == ACTION_SELECT_GROUND_ITEM:
-            # 1 byte: flags
-            # 8 bytes: 2x ObjectID
-            offset += 9
-
-        elif action_id == ACTION_CANCEL_HERO_REVIVAL:
-            # 8 bytes: 2x UnitID
-            offset += 8
-
-        elif action_id == ACTION_REMOVE_FROM_QUEUE:
-            # 1 byte: slot number
-            # 4 bytes: ItemID
-            if offset + 5 <= len(data):
-                action_data["slot"] = data[offset]
-                offset += 1
-                action_data["item_id"] = data[offset : offset + 4]
-                offset += 4
-
-        elif action_id == ACTION_ALLY_OPTIONS:
-            # 1 byte: player slot
-            # 4 bytes: flags
-            if offset + 5 <= len(data):
-                action_data["player_slot"] = data[offset]
-                offset += 1
-                action_data["flags"] = struct.unpack_from("<I", data, offset)[0]
-                offset += 4
-
-        elif action_id == ACTION_TRANSFER_RESOURCES:
-            # 1 byte: player slot
-            # 4 bytes: gold
-            # 4 bytes: lumber
-            if offset + 9 <= len(data):
-                action_data["player_slot"] = data[offset]
-                offset += 1
-                action_data["gold"] = struct.unpack_from("<I", data, offset)[0]
-                offset += 4
-                action_data["lumber"] = struct.unpack_from("<I", data, offset)[0]
-                offset += 4
-
-        elif action_id == ACTION_TRIGGER_COMMAND:
-            # Skip 8 bytes of unknowns, then null-terminated string
-            offset += 8
-            str_start = offset
-            while offset < len(data) and data[offset] != 0:
-                offset += 1
-            action_data["command"] = data[str_start:offset].decode("utf-8", errors="replace")
-            offset += 1
-
-        elif action_id == ACTION_ESC_PRESSED:
-            pass  # 1 byte total
-
-        elif action_id == ACTION_SCENARIO_TRIGGER:
-            offset += 12
-
-        elif action_id in (ACTION_HERO_SKILL_MENU, ACTION_BUILDING_MENU):
-            pass  # 1 byte total
-
-        elif action_id == ACTION_MINIMAP_SIGNAL:
-            if offset + 12 <= len(data):
-                x, y = struct.unpack_from("<ff", data, offset)
-                action_data["x"] = x
-                action_data["y"] = y
-                offset += 12
-
-        elif action_id in (ACTION_CONTINUE_GAME_B, ACTION_CONTINUE_GAME_A):
-            offset += 16
-
-        elif action_id == ACTION_UNKNOWN_75:
-            offset += 1
-
-        elif action_id in CHEAT_ACTIONS:
-            # Skip cheat actions (single player)
-            # Most are 1 byte, some are up to 6
-            action_name = "cheat"
-            # Simple heuristic: skip a few bytes
-            offset += min(5, len(data) - offset)
-
-        else:
-            # Unknown action - try to skip safely
-            # This is risky as we don't know the size
-            logger.debug(f"Unknown action 0x{action_id:02X} at offset {start_offset}")
-            return None, offset
-
-    except Exception as e:
-        logger.debug(f"Error parsing action 0x{action_id:02X}: {e}")
+    entry = _handlers_for_version(version)[action_id]
+    if entry is None:
+        # Unknown action - we don't know its size, so stop here
+        logger.debug(f"Unknown action 0x{action_id:02X} at offset {start_offset}")
         return None, offset
 
+    handler, size = entry
+    if handler is None:
+        action_data = None
+        offset += size
+    elif offset + size <= len(data):
+        action_data, offset = handler(data, offset)
+    else:
+        action_data = None
+
     payload = data[start_offset:offset]
+    if type(payload) is not bytes:
+        payload = bytes(payload)
 
     return GameAction(
         timestamp_ms=0,  # Set by caller
         player_id=0,  # Set by caller
         action_type=action_id,
-        action_name=action_name,
+        action_name=_ACTION_NAME_TABLE[action_id],
         payload=payload,
-        data=action_data,
+        data=action_data if action_data is not None else {},
     ), offset
 
 
 def parse_command_data(
-    data: bytes, offset: int, length: int, version: int
-) -> Iterator[tuple[int, GameAction]]:
+    data: bytes,
+    offset: int,
+    length: int,
+    version: int,
+    emit_noise_actions: bool = True,
+    timestamp_ms: int = 0,
+    keep_payloads: bool = True,
+) -> list[tuple[int, GameAction]]:
     """Parse CommandData block containing player actions.
 
     CommandData structure:
@@ -599,32 +777,80 @@ def parse_command_data(
         offset: Starting offset
         length: Total length of command data
         version: Game version
+        emit_noise_actions: If False, skip bookkeeping actions (selection
+            sync, menus, cheats, ...) instead of returning them
+        timestamp_ms: Timestamp assigned to every parsed action
+        keep_payloads: If False, leave GameAction.payload empty instead of
+            copying each action's raw bytes
 
-    Yields:
-        Tuples of (player_id, GameAction)
+    Returns:
+        List of (player_id, GameAction) tuples
     """
+    # This is the innermost loop of replay parsing, so parse_action() is
+    # inlined here rather than called once per action.
     end = offset + length
+    handlers = _handlers_for_version(version)
+    ignored = frozenset() if emit_noise_actions else _IGNORED_ACTIONS
+    action_names = _ACTION_NAME_TABLE
+    data_len = len(data)
+    # Slices of bytes are already immutable bytes; only copy other buffers
+    copy_payload = type(data) is not bytes
+    parsed: list[tuple[int, GameAction]] = []
+    append = parsed.append
 
     while offset < end:
-        if offset + 3 > len(data):
+        if offset + 3 > data_len:
             break
 
         player_id = data[offset]
         offset += 1
 
-        action_length = struct.unpack_from("<H", data, offset)[0]
+        action_length = _U16(data, offset)[0]
         offset += 2
 
         action_end = offset + action_length
 
-        while offset < action_end:
-            action, offset = parse_action(data, offset, version)
-            if action:
-                action.player_id = player_id
-                yield player_id, action
-            else:
-                # Skip remaining bytes if we can't parse
+        # Skip remaining bytes of the action block if we can't parse
+        stop = min(action_end, data_len)
+        while offset < stop:
+            action_id = data[offset]
+            entry = handlers[action_id]
+            if entry is None:
+                logger.debug(f"Unknown action 0x{action_id:02X} at offset {offset}")
                 break
+            handler, size = entry
+            next_offset = offset + 1
+            if handler is None:
+                # Fixed-size action without fields
+                action_data = None
+                next_offset += size
+            elif next_offset + size <= data_len:
+                action_data, next_offset = handler(data, next_offset)
+            else:
+                action_data = None
+
+            if action_id not in ignored:
+                if keep_payloads:
+                    payload = data[offset:next_offset]
+                    if copy_payload:
+                        payload = bytes(payload)
+                else:
+                    payload = b""
+                # Positional arguments (field order of GameAction): keyword
+                # matching in the generated __init__ is a sizeable share of
+                # the per-action cost
+                action = GameAction(
+                    timestamp_ms,
+                    player_id,
+                    action_id,
+                    action_names[action_id],
+                    payload,
+                    action_data if action_data is not None else {},
+                )
+                append((player_id, action))
+            offset = next_offset
 
         # Ensure we don't go past the action block
         offset = action_end
+
+    return parsed
@@ -5,6 +5,10 @@ import struct
 from w3g_parser.constants import CHAT_FLAG_NORMAL, CHAT_FLAG_STARTUP
 from w3g_parser.models import ChatMessage
 
+# Sender ID, message length and flags
+_CHAT_HEADER = struct.Struct("<BHB").unpack_from
+_U32 = struct.Struct("<I").unpack_from
+
 
 def parse_chat_message(
     data: bytes, offset: int, player_names: dict[int, str]
@@ -29,14 +33,8 @@ def parse_chat_message(
     if offset + 4 > len(data):
         return None, offset
 
-    player_id = data[offset]
-    offset += 1
-
-    msg_length = struct.unpack_from("<H", data, offset)[0]
-    offset += 2
-
-    flags = data[offset]
-    offset += 1
+    player_id, msg_length, flags = _CHAT_HEADER(data, offset)
+    offset += 4
 
     mode = 0
     is_startup = False
@@ -45,18 +43,21 @@ def parse_chat_message(
         is_startup = True
     elif flags == CHAT_FLAG_NORMAL:
         if offset + 4 <= len(data):
-            mode = struct.unpack_from("<I", data, offset)[0]
+            mode = _U32(data, offset)[0]
             offset += 4
     else:
         # Unknown flag, try to continue
         pass
 
     # Read message text
-    msg_start = offset
-    while offset < len(data) and data[offset] != 0:
-        offset += 1
-    message = data[msg_start:offset].decode("utf-8", errors="replace")
-    offset += 1  # Skip null terminator
+    msg_end = data.find(b"\x00", offset)
+    if msg_end < 0:
+        # Unterminated: the message runs to the end of the data
+        msg_end = len(data)
+    raw = data[offset:msg_end]
+    # Most chat is plain ASCII, which skips the UTF-8 decoder's error handling
+    message = raw.decode("ascii") if raw.isascii() else raw.decode("utf-8", "replace")
+    offset = msg_end + 1  # Skip null terminator
 
     player_name = player_names.get(player_id, f"Player {player_id}")
 
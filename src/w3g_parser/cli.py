@@ -1,11 +1,19 @@
 """Command-line interface for W3G parser."""
 
-import json
+import os
+import re
 import sys
+from collections import deque
+from collections.abc import Iterator
+from concurrent.futures import Future, ProcessPoolExecutor
+from contextlib import nullcontext
+from itertools import islice, repeat
+from math import isnan
 from pathlib import Path
 
 import click
 
+from w3g_parser.models import dump_json
 from w3g_parser.parser import W3GParser
 
 
@@ -99,7 +107,7 @@ def players(replay: str):
 def chat(replay: str):
     """Show chat messages."""
     try:
-        parser = W3GParser()
+        parser = W3GParser(parse_actions=False)
         result = parser.parse(replay)
 
         if not result.chat_messages:
@@ -145,39 +153,141 @@ def info(replay: str):
         sys.exit(1)
 
 
+def _parse_for_batch(replay_path: str, ndjson: bool) -> tuple[str | None, str | None]:
+    """Parse one replay for the batch command.
+
+    Runs in worker processes, so failures are returned rather than raised to
+    keep the remaining replays going. The JSON is encoded in the worker too,
+    which keeps it off the main process and is cheaper to send back than
+    the parsed data.
+
+    Args:
+        replay_path: Path to the replay file
+        ndjson: If True, encode compactly on one line
+
+    Returns:
+        (JSON text, None) on success, or (None, error message) on failure
+    """
+    try:
+        result = W3GParser(strict=False).parse(replay_path)
+        data = result.to_dict()
+        data["_source_file"] = str(replay_path)
+    except Exception as e:
+        return None, str(e)
+    return dump_json(data, indent=None if ndjson else 2), None
+
+
+def _parse_batch_in_pool(
+    executor: ProcessPoolExecutor, replays: tuple[str, ...], ndjson: bool, window: int
+) -> Iterator[tuple[str | None, str | None]]:
+    """Parse replays in a process pool, yielding results in input order.
+
+    At most `window` replays are submitted at a time, and another is
+    submitted as each result is taken, so replays that finish ahead of a
+    slow one can't pile up in memory.
+
+    Args:
+        executor: Process pool to parse in
+        replays: Paths of the replay files
+        ndjson: If True, encode compactly on one line
+        window: Maximum number of replays in flight
+
+    Yields:
+        The _parse_for_batch result of each replay, or (None, error message)
+        if the pool could not run it
+    """
+
+    def submit(replay_path: str) -> Future[tuple[str | None, str | None]]:
+        try:
+            return executor.submit(_parse_for_batch, replay_path, ndjson)
+        except Exception as e:
+            # A broken pool refuses new work; fail just this replay
+            failed: Future[tuple[str | None, str | None]] = Future()
+            failed.set_exception(e)
+            return failed
+
+    remaining = iter(replays)
+    pending = deque(submit(replay_path) for replay_path in islice(remaining, window))
+    while pending:
+        try:
+            result = pending.popleft().result()
+        except Exception as e:
+            # BrokenProcessPool if a worker died, failing every replay in flight
+            result = None, str(e)
+        for replay_path in islice(remaining, 1):
+            pending.append(submit(replay_path))
+        yield result
+
+
 @main.command()
 @click.argument("replays", type=click.Path(exists=True), nargs=-1)
 @click.option("--output", "-o", type=click.Path(), required=True, help="Output JSON file")
-def batch(replays: tuple[str, ...], output: str):
-    """Parse multiple replays to a JSON array."""
+@click.option(
+    "--ndjson", is_flag=True, help="Write one JSON object per line instead of a JSON array"
+)
+@click.option(
+    "--workers",
+    "-j",
+    type=click.IntRange(min=1),
+    default=None,
+    help="Number of worker processes (default: one per CPU)",
+)
+def batch(replays: tuple[str, ...], output: str, ndjson: bool, workers: int | None):
+    """Parse multiple replays to a JSON array (or JSON lines with --ndjson)."""
     if not replays:
         click.echo("No replay files specified.", err=True)
         sys.exit(1)
 
-    parser = W3GParser(strict=False)
-    results = []
+    workers = workers or os.cpu_count() or 1
+    parallel = workers > 1 and len(replays) > 1
+    parsed = 0
     errors = 0
 
-    with click.progressbar(replays, label="Parsing replays") as bar:
-        for replay_path in bar:
-            try:
-                result = parser.parse(replay_path)
-                data = result.to_dict()
-                data["_source_file"] = str(replay_path)
-                results.append(data)
-            except Exception as e:
-                click.echo(f"\nError parsing {replay_path}: {e}", err=True)
-                errors += 1
-
-    Path(output).write_text(
-        json.dumps(results, indent=2, ensure_ascii=False), encoding="utf-8"
-    )
-    click.echo(f"Parsed {len(results)} replays to {output} ({errors} errors)")
+    # Results come back in input order and each replay is written out as
+    # soon as it arrives; workers run at most two replays ahead each, so
+    # only that many encoded replays are held at a time
+    with (
+        open(output, "w", encoding="utf-8") as out,
+        click.progressbar(length=len(replays), label="Parsing replays") as bar,
+        ProcessPoolExecutor(max_workers=workers) if parallel else nullcontext() as executor,
+    ):
+        if executor is not None:
+            results = _parse_batch_in_pool(executor, replays, ndjson, 2 * workers)
+        else:
+            results = map(_parse_for_batch, replays, repeat(ndjson))
+        if not ndjson:
+            out.write("[")
+        try:
+            for replay_path, (text, error) in zip(replays, results, strict=True):
+                bar.update(1)
+                if text is None:
+                    click.echo(f"\nError parsing {replay_path}: {error}", err=True)
+                    errors += 1
+                    continue
+
+                if ndjson:
+                    out.write(text)
+                    out.write("\n")
+                else:
+                    # Same layout as dumping the whole list with indent=2; JSON
+                    # strings never contain raw newlines, so re-indenting is safe
+                    out.write(",\n  " if parsed else "\n  ")
+                    out.write(text.replace("\n", "\n  "))
+                parsed += 1
+        finally:
+            # Close the array even if the batch is interrupted, so the
+            # replays written so far still form valid JSON
+            if not ndjson:
+                out.write("\n]" if parsed else "]")
+
+    click.echo(f"Parsed {parsed} replays to {output} ({errors} errors)")
 
 
 @main.command()
 @click.argument("replay", type=click.Path(exists=True))
-@click.option("--limit", "-n", type=int, default=50, help="Maximum actions to show")
+@click.option(
+    "--limit", "-n", type=click.IntRange(min=0), default=50, help="Maximum actions to show"
+)
 @click.option("--detail", "-d", is_flag=True, help="Show detailed action information")
 @click.option(
     "--filter",
@@ -186,32 +296,61 @@ def batch(replays: tuple[str, ...], output: str):
     type=str,
     help="Filter by action type (e.g., ability_position, select_units)",
 )
-def actions(replay: str, limit: int, detail: bool, action_filter: str | None):
+@click.option(
+    "--regex",
+    "-r",
+    is_flag=True,
+    help="Treat --filter as a case-insensitive regular expression",
+)
+def actions(replay: str, limit: int, detail: bool, action_filter: str | None, regex: bool):
     """Show game actions."""
     from w3g_parser.actions import decode_item_id
 
+    search = None
+    if action_filter and regex:
+        try:
+            search = re.compile(action_filter, re.IGNORECASE).search
+        except re.error as e:
+            raise click.BadParameter(str(e), param_hint="'--filter'") from e
+
     try:
         parser = W3GParser()
         result = parser.parse(replay)
 
-        # Filter actions if requested
-        filtered_actions = result.actions
+        # Filter actions if requested. Only the shown matches are kept; the
+        # rest are just counted for the total. Action names are all
+        # lowercase, so only the filter needs folding
         if action_filter:
-            filtered_actions = [
-                a for a in result.actions if action_filter.lower() in a.action_name.lower()
-            ]
+            if search is not None:
+                # Only a few dozen distinct names occur, so run the pattern
+                # once per name rather than once per action
+                names = {a.action_name for a in result.actions}
+                matching_names = {name for name in names if search(name)}
+                matches = (a for a in result.actions if a.action_name in matching_names)
+            else:
+                needle = action_filter.lower()
+                matches = (a for a in result.actions if needle in a.action_name)
+            shown_actions = list(islice(matches, limit))
+            total = len(shown_actions) + sum(1 for _ in matches)
+        else:
+            shown_actions = result.actions[:limit]
+            total = len(result.actions)
 
-        total = len(filtered_actions)
-        shown = min(limit, total)
+        shown = len(shown_actions)
 
         filter_note = f" matching '{action_filter}'" if action_filter else ""
         click.echo(f"Game Actions (showing {shown} of {total}{filter_note}):")
         click.echo("-" * 70)
 
-        for action in filtered_actions[:limit]:
+        # Look players up once instead of scanning the player list per action
+        player_names = {p.id: p.name for p in reversed(result.players)}
+        echo = click.echo
+
+        for action in shown_actions:
             ts = format_duration(action.timestamp)
-            player = result.get_player(action.player_id)
-            player_name = player.name if player else f"Player {action.player_id}"
+            player_name = player_names.get(action.player_id)
+            if player_name is None:
+                player_name = f"Player {action.player_id}"
 
             if detail:
                 # Show detailed action info
@@ -227,7 +366,7 @@ def actions(replay: str, limit: int, detail: bool, action_filter: str | None):
                 # Add coordinates
                 if "target_x" in action.data and "target_y" in action.data:
                     x, y = action.data["target_x"], action.data["target_y"]
-                    if x == x and y == y:  # Check for NaN
+                    if not (isnan(x) or isnan(y)):
                         detail_parts.append(f"at ({x:.0f}, {y:.0f})")
 
                 # Add unit count with select mode and object IDs
@@ -256,9 +395,9 @@ def actions(replay: str, limit: int, detail: bool, action_filter: str | None):
                     detail_parts.append(f"gold={gold}, lumber={lumber}")
 
                 detail_str = " - " + " ".join(detail_parts) if detail_parts else ""
-                click.echo(f"[{ts}] {player_name}: {action.action_name}{detail_str}")
+                echo(f"[{ts}] {player_name}: {action.action_name}{detail_str}")
             else:
-                click.echo(f"[{ts}] {player_name}: {action.action_name}")
+                echo(f"[{ts}] {player_name}: {action.action_name}")
 
         if total > limit:
             click.echo(f"\n... and {total - limit} more actions")
@@ -1,14 +1,47 @@
 """Block decompression for W3G replay files."""
 
+import mmap
 import struct
-import zlib
+from collections.abc import Iterator
+from concurrent.futures import ThreadPoolExecutor
+from itertools import repeat
 from typing import BinaryIO
 
+# ISA-L inflates considerably faster than stock zlib and mirrors its API, so
+# use it when the optional "fast" extra is installed
+try:
+    from isal import isal_zlib as _zlib  # type: ignore[import-not-found, unused-ignore]
+except ImportError:
+    import zlib as _zlib
+
 from w3g_parser.exceptions import DecompressionError, TruncatedDataError
 from w3g_parser.models import ReplayHeader
 
+# Only the size fields of each block header are read; checksums are skipped
+_CLASSIC_BLOCK_HEADER = struct.Struct("<HH4x").unpack_from
+_REFORGED_BLOCK_HEADER = struct.Struct("<H2xI4x").unpack_from
+
+# Window bits for the two block formats
+_WBITS_RAW = -15
+_WBITS_ZLIB = 15
+
+
+def _inflate(data: bytes, wbits: int) -> bytes:
+    """Inflate one self-contained block.
+
+    Classic blocks end on a sync flush rather than a finished deflate stream,
+    which one-shot zlib.decompress rejects as truncated, so a decompress
+    object is used. Without an output limit it returns everything in one
+    call and flush() has nothing left to add.
 
-def decompress_blocks(stream: BinaryIO, header: ReplayHeader) -> bytes:
+    Raises:
+        _zlib.error: If the data is not valid for the given format
+    """
+    inflated: bytes = _zlib.decompressobj(wbits=wbits).decompress(data)
+    return inflated
+
+
+def decompress_blocks(stream: BinaryIO, header: ReplayHeader, workers: int = 1) -> bytes:
     """Decompress all data blocks from stream.
 
     Block format varies by version:
@@ -29,6 +62,7 @@ def decompress_blocks(stream: BinaryIO, header: ReplayHeader) -> bytes:
     Args:
         stream: Binary stream positioned after header
         header: Parsed replay header
+        workers: Number of inflater threads (see decompress_buffer)
 
     Returns:
         Concatenated decompressed data
@@ -37,89 +71,139 @@ def decompress_blocks(stream: BinaryIO, header: ReplayHeader) -> bytes:
         DecompressionError: If decompression fails
         TruncatedDataError: If not enough data
     """
-    decompressed_parts: list[bytes] = []
+    start = stream.tell()
+    return _decompress_buffer(stream.read(), 0, header, start, workers)
+
+
+def decompress_buffer(
+    buf: bytes | mmap.mmap,
+    offset: int,
+    header: ReplayHeader,
+    workers: int = 1,
+) -> bytes:
+    """Decompress all data blocks from an in-memory replay.
+
+    Same block formats as decompress_blocks, but blocks are sliced straight
+    out of the buffer instead of going through two stream reads each. Any
+    sliceable buffer works, including an mmap of the replay file.
+
+    Blocks are independent deflate streams and zlib releases the GIL while
+    inflating, so with workers > 1 large replays are inflated on a thread
+    pool.
+
+    Args:
+        buf: Replay data
+        offset: Offset of the first data block
+        header: Parsed replay header
+        workers: Number of inflater threads (default: inflate serially)
+
+    Returns:
+        Concatenated decompressed data
+
+    Raises:
+        DecompressionError: If decompression fails
+        TruncatedDataError: If not enough data
+    """
+    return _decompress_buffer(buf, offset, header, 0, workers)
+
+
+# Below this many blocks, handing blocks to threads costs more than
+# inflating them in the calling thread
+PARALLEL_MIN_BLOCKS = 64
+
+
+def _decompress_buffer(
+    buf: bytes | mmap.mmap,
+    offset: int,
+    header: ReplayHeader,
+    base: int,
+    workers: int = 1,
+) -> bytes:
+    """Decompress blocks from buf, reporting error offsets relative to base."""
+    end = len(buf)
 
     # Determine if this is Reforged format
     # Reforged uses 12-byte block headers and zlib with headers
-    is_reforged = header.is_reforged
-
+    if header.is_reforged:
+        block_header_size = 12
+        unpack_block_header = _REFORGED_BLOCK_HEADER
+        wbits, fallback_wbits = _WBITS_ZLIB, None
+    else:
+        block_header_size = 8
+        unpack_block_header = _CLASSIC_BLOCK_HEADER
+        wbits, fallback_wbits = _WBITS_RAW, _WBITS_ZLIB
+
+    # First pass: slice out every block. A truncated block is only reported
+    # once the blocks before it have been inflated, as they would be when
+    # reading block by block.
+    data_offsets: list[int] = []
+    blocks: list[bytes] = []
+    truncated: TruncatedDataError | None = None
     for block_num in range(header.num_compressed_blocks):
-        if is_reforged:
-            # Reforged: 12-byte header
-            block_header = stream.read(12)
-            if len(block_header) < 12:
-                raise TruncatedDataError(
-                    f"Block {block_num} header truncated",
-                    stream.tell()
-                )
-
-            # Parse Reforged header
-            # compressed_size is the size of zlib data only
-            compressed_size = struct.unpack_from("<H", block_header, 0)[0]
-            decompressed_size = struct.unpack_from("<I", block_header, 4)[0]
-
-            # Read compressed data
-            compressed_data = stream.read(compressed_size)
-            if len(compressed_data) < compressed_size:
-                raise TruncatedDataError(
-                    f"Block {block_num} data truncated: expected {compressed_size}, "
-                    f"got {len(compressed_data)}",
-                    stream.tell()
-                )
-
-            # Decompress using zlib (with header)
-            try:
-                decompressor = zlib.decompressobj()
-                decompressed = decompressor.decompress(compressed_data)
-                decompressed += decompressor.flush()
-            except zlib.error as e:
-                raise DecompressionError(
-                    f"Block {block_num} decompression failed: {e}",
-                    stream.tell() - compressed_size
-                ) from e
-
-        else:
-            # Classic: 8-byte header
-            block_header = stream.read(8)
-            if len(block_header) < 8:
-                raise TruncatedDataError(
-                    f"Block {block_num} header truncated",
-                    stream.tell()
-                )
-
-            compressed_size, decompressed_size, _ = struct.unpack("<HHI", block_header)
-
-            # Read compressed data
-            compressed_data = stream.read(compressed_size)
-            if len(compressed_data) < compressed_size:
-                raise TruncatedDataError(
-                    f"Block {block_num} data truncated: expected {compressed_size}, "
-                    f"got {len(compressed_data)}",
-                    stream.tell()
-                )
-
-            # Decompress using raw deflate (no header)
-            try:
-                decompressor = zlib.decompressobj(wbits=-15)
-                decompressed = decompressor.decompress(compressed_data)
-                decompressed += decompressor.flush()
-            except zlib.error:
-                # Fall back to zlib with header
-                try:
-                    decompressor = zlib.decompressobj()
-                    decompressed = decompressor.decompress(compressed_data)
-                    decompressed += decompressor.flush()
-                except zlib.error as e:
-                    raise DecompressionError(
-                        f"Block {block_num} decompression failed: {e}",
-                        stream.tell() - compressed_size
-                    ) from e
-
-        decompressed_parts.append(decompressed)
+        if offset + block_header_size > end:
+            truncated = TruncatedDataError(f"Block {block_num} header truncated", base + end)
+            break
+
+        # compressed_size is the size of the deflate data only
+        compressed_size, decompressed_size = unpack_block_header(buf, offset)
+        offset += block_header_size
+
+        # Read compressed data
+        compressed_data = buf[offset:offset + compressed_size]
+        if len(compressed_data) < compressed_size:
+            truncated = TruncatedDataError(
+                f"Block {block_num} data truncated: expected {compressed_size}, "
+                f"got {len(compressed_data)}",
+                base + end
+            )
+            break
+
+        data_offsets.append(base + offset)
+        blocks.append(compressed_data)
+        offset += compressed_size
+
+    # Second pass: inflate, in order
+    if workers > 1 and len(blocks) >= PARALLEL_MIN_BLOCKS:
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            decompressed_parts = _collect_blocks(
+                executor.map(_inflate_block, blocks, repeat(wbits), repeat(fallback_wbits)),
+                data_offsets,
+            )
+    else:
+        decompressed_parts = _collect_blocks(
+            map(_inflate_block, blocks, repeat(wbits), repeat(fallback_wbits)),
+            data_offsets,
+        )
 
+    if truncated is not None:
+        raise truncated
     return b"".join(decompressed_parts)
 
 
+def _inflate_block(data: bytes, wbits: int, fallback_wbits: int | None) -> bytes:
+    """Inflate a block, retrying in the fallback format if there is one."""
+    try:
+        return _inflate(data, wbits)
+    except _zlib.error:
+        if fallback_wbits is None:
+            raise
+        # Classic blocks fall back to zlib with header
+        return _inflate(data, fallback_wbits)
+
+
+def _collect_blocks(parts: Iterator[bytes], data_offsets: list[int]) -> list[bytes]:
+    """Gather inflated blocks, turning the first failure into a DecompressionError."""
+    decompressed_parts: list[bytes] = []
+    for block_num, data_offset in enumerate(data_offsets):
+        try:
+            decompressed_parts.append(next(parts))
+        except _zlib.error as e:
+            raise DecompressionError(
+                f"Block {block_num} decompression failed: {e}", data_offset
+            ) from e
+    return decompressed_parts
+
+
 def decompress_single_block(data: bytes, use_zlib_header: bool = False) -> bytes:
     """Decompress a single block of data.
 
@@ -130,21 +214,10 @@ def decompress_single_block(data: bytes, use_zlib_header: bool = False) -> bytes
     Returns:
         Decompressed data
     """
-    if use_zlib_header:
-        decompressor = zlib.decompressobj()
-    else:
-        decompressor = zlib.decompressobj(wbits=-15)
+    wbits = _WBITS_ZLIB if use_zlib_header else _WBITS_RAW
 
     try:
-        result = decompressor.decompress(data)
-        result += decompressor.flush()
-        return result
-    except zlib.error:
+        return _inflate(data, wbits)
+    except _zlib.error:
         # Try the other format
-        if use_zlib_header:
-            decompressor = zlib.decompressobj(wbits=-15)
-        else:
-            decompressor = zlib.decompressobj()
-        result = decompressor.decompress(data)
-        result += decompressor.flush()
-        return result
+        return _inflate(data, _WBITS_RAW if use_zlib_header else _WBITS_ZLIB)
@@ -1,12 +1,15 @@
 """Header parsing for W3G replay files."""
 
+import copy
+import io
+import mmap
+import os
 import struct
+from functools import lru_cache
 from typing import BinaryIO
 
 from w3g_parser.constants import (
     BASE_HEADER_SIZE,
-    HEADER_V0_TOTAL,
-    HEADER_V1_TOTAL,
     MAGIC_STRING,
     SUBHEADER_V0_SIZE,
     SUBHEADER_V1_SIZE,
@@ -14,6 +17,64 @@ from w3g_parser.constants import (
 from w3g_parser.exceptions import InvalidHeaderError, TruncatedDataError
 from w3g_parser.models import ReplayHeader
 
+# Base header fields from 0x1C on, and the two subheader layouts
+_BASE_HEADER_FIELDS = struct.Struct("<28xIIIII")
+_SUBHEADER_V0 = struct.Struct("<HHHHII")
+_SUBHEADER_V1 = struct.Struct("<4sIHHII")
+
+
+def _parse_subheader_v0(
+    data: bytes | mmap.mmap, offset: int
+) -> tuple[str, int, int, int, int, int]:
+    """Parse a version 0 subheader (Classic, patches <= 1.06).
+
+    Layout:
+    - Offset 0x00: unknown (1 word, always 0)
+    - Offset 0x02: version number (1 word)
+    - Offset 0x04: build number (1 word)
+    - Offset 0x06: flags (1 word)
+    - Offset 0x08: duration (1 dword)
+    - Offset 0x0C: CRC32 (1 dword)
+
+    Returns:
+        (game identifier, version, build number, flags, duration in ms, CRC32)
+    """
+    _, version, build_number, flags, duration_ms, crc32 = _SUBHEADER_V0.unpack_from(data, offset)
+    # Classic replays use 'WAR3' identifier
+    return "WAR3", version, build_number, flags, duration_ms, crc32
+
+
+def _parse_subheader_v1(
+    data: bytes | mmap.mmap, offset: int
+) -> tuple[str, int, int, int, int, int]:
+    """Parse a version 1 subheader (Expansion, patches >= 1.07).
+
+    Layout:
+    - Offset 0x00: game identifier (1 dword): 'WAR3' or 'W3XP'
+    - Offset 0x04: version number (1 dword)
+    - Offset 0x08: build number (1 word)
+    - Offset 0x0A: flags (1 word)
+    - Offset 0x0C: duration (1 dword)
+    - Offset 0x10: CRC32 (1 dword)
+
+    Returns:
+        (game identifier, version, build number, flags, duration in ms, CRC32)
+    """
+    game_id_bytes, version, build_number, flags, duration_ms, crc32 = (
+        _SUBHEADER_V1.unpack_from(data, offset)
+    )
+    # Decode game identifier (stored as little-endian 4-char string)
+    game_identifier = game_id_bytes.decode("ascii", errors="replace")
+    return game_identifier, version, build_number, flags, duration_ms, crc32
+
+
+# Header version -> (subheader size, subheader parser)
+_SUBHEADER_PARSERS = {
+    0: (SUBHEADER_V0_SIZE, _parse_subheader_v0),
+    1: (SUBHEADER_V1_SIZE, _parse_subheader_v1),
+}
+_MAX_HEADER_SIZE = BASE_HEADER_SIZE + max(size for size, _ in _SUBHEADER_PARSERS.values())
+
 
 def parse_header(stream: BinaryIO) -> ReplayHeader:
     """Parse the W3G file header from a stream.
@@ -32,13 +93,44 @@ def parse_header(stream: BinaryIO) -> ReplayHeader:
         InvalidHeaderError: If header is invalid
         TruncatedDataError: If not enough data
     """
-    # Read base header (48 bytes)
-    base_header = stream.read(BASE_HEADER_SIZE)
-    if len(base_header) < BASE_HEADER_SIZE:
-        raise TruncatedDataError("File too small for header", len(base_header))
+    # One read covers either layout; give back what the shorter v0 header
+    # doesn't use so the stream ends up right after the header
+    data = stream.read(_MAX_HEADER_SIZE)
+    header, end = _parse_header_bytes(data)
+    if end < len(data):
+        stream.seek(end - len(data), io.SEEK_CUR)
+    return header
+
+
+def parse_header_from_bytes(data: bytes | mmap.mmap) -> ReplayHeader:
+    """Parse header from bytes.
+
+    Args:
+        data: Raw header bytes. Anything after the header is ignored, so a
+            whole replay (or an mmap of one) can be passed.
+
+    Returns:
+        Parsed ReplayHeader
+    """
+    return _parse_header_bytes(data)[0]
+
+
+def _parse_header_bytes(
+    data: bytes | mmap.mmap, offset: int = 0
+) -> tuple[ReplayHeader, int]:
+    """Parse the header at data[offset:] (see parse_header).
+
+    Returns:
+        Tuple of (parsed ReplayHeader, offset just past the header)
+    """
+    available = len(data) - offset
+
+    # Base header (48 bytes)
+    if available < BASE_HEADER_SIZE:
+        raise TruncatedDataError("File too small for header", max(available, 0))
 
     # Validate magic string
-    magic = base_header[:28]
+    magic = data[offset:offset + 28]
     if magic != MAGIC_STRING:
         raise InvalidHeaderError(
             f"Invalid magic string: {magic!r}, expected {MAGIC_STRING!r}"
@@ -50,60 +142,27 @@ def parse_header(stream: BinaryIO) -> ReplayHeader:
     # Offset 0x24: Header version (0 or 1)
     # Offset 0x28: Decompressed data size
     # Offset 0x2C: Number of compressed blocks
-    header_size, compressed_size, header_version, decompressed_size, num_blocks = struct.unpack(
-        "<IIIII", base_header[0x1C:0x30]
+    # Some replays report a header size that differs from the layout's
+    # nominal total; the reported size is used as-is.
+    header_size, compressed_size, header_version, decompressed_size, num_blocks = (
+        _BASE_HEADER_FIELDS.unpack_from(data, offset)
     )
 
-    # Determine subheader size based on version
-    if header_version == 0:
-        subheader_size = SUBHEADER_V0_SIZE
-        expected_header_size = HEADER_V0_TOTAL
-    elif header_version == 1:
-        subheader_size = SUBHEADER_V1_SIZE
-        expected_header_size = HEADER_V1_TOTAL
-    else:
-        raise InvalidHeaderError(f"Unknown header version: {header_version}")
-
-    # Validate header size
-    if header_size != expected_header_size:
-        # Some replays may have slightly different header sizes
-        # We'll use the reported size but warn-level log would go here
-        pass
-
-    # Read subheader
-    subheader = stream.read(subheader_size)
-    if len(subheader) < subheader_size:
-        raise TruncatedDataError("File too small for subheader", BASE_HEADER_SIZE + len(subheader))
-
-    # Parse subheader based on version
-    if header_version == 0:
-        # Version 0 (Classic, patches <= 1.06)
-        # Offset 0x00: unknown (1 word, always 0)
-        # Offset 0x02: version number (1 word)
-        # Offset 0x04: build number (1 word)
-        # Offset 0x06: flags (1 word)
-        # Offset 0x08: duration (1 dword)
-        # Offset 0x0C: CRC32 (1 dword)
-        _, version, build_number, flags, duration_ms, crc32 = struct.unpack(
-            "<HHHHI I", subheader
-        )
-        # Classic replays use 'WAR3' identifier
-        game_identifier = "WAR3"
-    else:
-        # Version 1 (Expansion, patches >= 1.07)
-        # Offset 0x00: game identifier (1 dword): 'WAR3' or 'W3XP'
-        # Offset 0x04: version number (1 dword)
-        # Offset 0x08: build number (1 word)
-        # Offset 0x0A: flags (1 word)
-        # Offset 0x0C: duration (1 dword)
-        # Offset 0x10: CRC32 (1 dword)
-        game_id_bytes, version, build_number, flags, duration_ms, crc32 = struct.unpack(
-            "<4sIHHII", subheader
-        )
-        # Decode game identifier (stored as little-endian 4-char string)
-        game_identifier = game_id_bytes.decode("ascii", errors="replace")
+    # Subheader size and layout depend on the header version
+    try:
+        subheader_size, parse_subheader = _SUBHEADER_PARSERS[header_version]
+    except KeyError:
+        raise InvalidHeaderError(f"Unknown header version: {header_version}") from None
+
+    if available < BASE_HEADER_SIZE + subheader_size:
+        raise TruncatedDataError("File too small for subheader", available)
+
+    game_identifier, version, build_number, flags, duration_ms, crc32 = parse_subheader(
+        data, offset + BASE_HEADER_SIZE
+    )
+    end = offset + BASE_HEADER_SIZE + subheader_size
 
-    return ReplayHeader(
+    header = ReplayHeader(
         magic=magic,
         header_size=header_size,
         compressed_size=compressed_size,
@@ -116,19 +175,30 @@ def parse_header(stream: BinaryIO) -> ReplayHeader:
         flags=flags,
         duration_ms=duration_ms,
         crc32=crc32,
-        raw_header=base_header + subheader,
+        raw_header=data[offset:end],
     )
+    return header, end
 
 
-def parse_header_from_bytes(data: bytes) -> ReplayHeader:
-    """Parse header from bytes.
+def parse_header_from_file(path: str | os.PathLike[str]) -> ReplayHeader:
+    """Parse the header of a replay file, reusing earlier results.
+
+    Headers are cached per file path, modification time and size, so
+    repeated lookups of an unchanged file don't reopen it.
 
     Args:
-        data: Raw header bytes
+        path: Path to the replay file
 
     Returns:
-        Parsed ReplayHeader
+        Parsed ReplayHeader (a copy the caller is free to modify)
     """
-    import io
+    path = os.path.abspath(path)
+    stat = os.stat(path)
+    return copy.copy(_parse_header_cached(path, stat.st_mtime_ns, stat.st_size))
+
 
-    return parse_header(io.BytesIO(data))
+@lru_cache(maxsize=1024)
+def _parse_header_cached(path: str, mtime_ns: int, size: int) -> ReplayHeader:
+    """Parse a replay header; mtime_ns and size only key the cache."""
+    with open(path, "rb") as f:
+        return parse_header(f)
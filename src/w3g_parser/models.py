@@ -7,6 +7,41 @@ import json
 from pathlib import Path
 from typing import Any
 
+# orjson serializes several times faster than the json module and is used
+# when the optional "fast" extra is installed
+try:
+    import orjson
+except ImportError:
+    orjson = None  # type: ignore[assignment]
+
+
+def dump_json(data: Any, indent: int | None = 2) -> str:
+    """Serialize parse results to a JSON string.
+
+    With orjson installed, the default 2-space and compact layouts are
+    produced by orjson; other indents, and data orjson rejects (non-str
+    keys, integers wider than 64 bits), fall back to the json module. The
+    output of to_dict() is the same either way. Other floats may be
+    formatted differently: orjson writes 1e-05 as 0.00001 and NaN or
+    Infinity as null.
+
+    Args:
+        data: JSON-compatible data (dicts with str keys, lists, str, int, ...)
+        indent: Indent level, or None for compact single-line output
+
+    Returns:
+        JSON string, with non-ASCII characters left unescaped
+    """
+    if orjson is not None and (indent == 2 or indent is None):
+        option = orjson.OPT_INDENT_2 if indent == 2 else 0
+        try:
+            return orjson.dumps(data, option=option).decode("utf-8")
+        except orjson.JSONEncodeError:
+            pass
+    if indent is None:
+        return json.dumps(data, ensure_ascii=False, separators=(",", ":"))
+    return json.dumps(data, indent=indent, ensure_ascii=False)
+
 
 class Race(IntEnum):
     """Player race."""
@@ -22,19 +57,19 @@ class Race(IntEnum):
     @classmethod
     def from_flags(cls, flags: int) -> "Race":
         """Get race from race flags byte."""
-        if flags & 0x01:
-            return cls.HUMAN
-        if flags & 0x02:
-            return cls.ORC
-        if flags & 0x04:
-            return cls.NIGHT_ELF
-        if flags & 0x08:
-            return cls.UNDEAD
-        if flags & 0x20:
-            return cls.RANDOM
-        if flags & 0x40:
-            return cls.SELECTABLE
-        return cls.UNKNOWN
+        return _RACE_BY_FLAGS[flags & 0xFF]
+
+
+def _race_for_flags(flags: int) -> Race:
+    """Pick the race of the first flag set, in enum order."""
+    for race in (Race.HUMAN, Race.ORC, Race.NIGHT_ELF, Race.UNDEAD, Race.RANDOM, Race.SELECTABLE):
+        if flags & race:
+            return race
+    return Race.UNKNOWN
+
+
+# Race for every flags byte; bits above the low byte don't select a race
+_RACE_BY_FLAGS = tuple(_race_for_flags(flags) for flags in range(256))
 
 
 class W3GVersion(IntEnum):
@@ -65,6 +100,28 @@ class LeaveResult(IntEnum):
     OBSERVER_LEFT = 0x0B
 
 
+# Reforged versions by build number
+_REFORGED_BUILD_VERSIONS = {
+    6105: "1.32.0",
+    6106: "1.32.1",
+    6108: "1.32.2",
+    6110: "1.32.3",
+    6111: "1.32.4",
+    6112: "1.32.5",
+    6113: "1.32.6",
+    6114: "1.32.7",
+    6115: "1.32.8",
+    6116: "1.32.9",
+    6117: "1.32.10",
+    6118: "1.33.0",
+    6119: "1.34.0",
+    6120: "1.35.0",
+    6121: "1.36.0",
+    6122: "1.36.1",
+    6123: "1.36.2",
+}
+
+
 @dataclass
 class ReplayHeader:
     """W3G file header information."""
@@ -112,28 +169,9 @@ class ReplayHeader:
         """Get human-readable version string."""
         # Reforged uses build number for version identification
         if self.is_reforged:
-            # Map known build numbers to versions
-            build_to_version = {
-                6105: "1.32.0",
-                6106: "1.32.1",
-                6108: "1.32.2",
-                6110: "1.32.3",
-                6111: "1.32.4",
-                6112: "1.32.5",
-                6113: "1.32.6",
-                6114: "1.32.7",
-                6115: "1.32.8",
-                6116: "1.32.9",
-                6117: "1.32.10",
-                6118: "1.33.0",
-                6119: "1.34.0",
-                6120: "1.35.0",
-                6121: "1.36.0",
-                6122: "1.36.1",
-                6123: "1.36.2",
-            }
-            if self.build_number in build_to_version:
-                return build_to_version[self.build_number]
+            version = _REFORGED_BUILD_VERSIONS.get(self.build_number)
+            if version is not None:
+                return version
             # Fallback: estimate version from build
             return f"1.3x (build {self.build_number})"
 
@@ -150,7 +188,7 @@ class ReplayHeader:
             return f"1.{self.version}"
 
 
-@dataclass
+@dataclass(slots=True)
 class PlayerInfo:
     """Information about a player in the replay."""
 
@@ -198,7 +236,7 @@ class GameSettings:
         return ["Slow", "Normal", "Fast"][min(self.speed, 2)]
 
 
-@dataclass
+@dataclass(slots=True)
 class ChatMessage:
     """In-game chat message."""
 
@@ -227,9 +265,12 @@ class ChatMessage:
             return f"Player {self.mode - 2}"
 
 
-@dataclass
+@dataclass(slots=True)
 class GameAction:
-    """A player action/command."""
+    """A player action/command.
+
+    Uses slots since a replay holds one instance per recorded action.
+    """
 
     timestamp_ms: int
     player_id: int
@@ -354,7 +395,7 @@ class W3GReplay:
     def to_json(self, filepath: str | Path | None = None, indent: int = 2) -> str:
         """Export to JSON string or file."""
         data = self.to_dict()
-        json_str = json.dumps(data, indent=indent, ensure_ascii=False)
+        json_str = dump_json(data, indent)
 
         if filepath:
             Path(filepath).write_text(json_str, encoding="utf-8")
@@ -1,8 +1,10 @@
 """Main W3G replay parser."""
 
 import logging
+import mmap
+import re
 import struct
-from io import BytesIO
+from io import BufferedReader, BytesIO
 from pathlib import Path
 from typing import BinaryIO, Iterator
 
@@ -19,9 +21,9 @@ from w3g_parser.constants import (
     BLOCK_TIMESLOT,
     BLOCK_TIMESLOT_OLD,
 )
-from w3g_parser.decompressor import decompress_blocks
+from w3g_parser.decompressor import decompress_blocks, decompress_buffer
 from w3g_parser.exceptions import W3GParseError
-from w3g_parser.header import parse_header
+from w3g_parser.header import parse_header, parse_header_from_bytes, parse_header_from_file
 from w3g_parser.models import (
     ChatMessage,
     GameAction,
@@ -40,17 +42,72 @@ from w3g_parser.players import (
 
 logger = logging.getLogger(__name__)
 
+# Precompiled unpackers for the fixed-width fields of the replay data blocks
+_U16 = struct.Struct("<H").unpack_from
+# LeaveGame: reason, player ID, result, unknown dword
+_LEAVE_GAME = struct.Struct("<IBI4x").unpack_from
+# TimeSlot: byte count (including the time increment), time increment
+_TIMESLOT_HEADER = struct.Struct("<HH").unpack_from
+
+# Block IDs handled by the replay data loop (0x23 is undocumented), used to
+# resynchronize after an unknown block
+_KNOWN_BLOCK_IDS = bytes(
+    (
+        BLOCK_LEAVE_GAME,
+        BLOCK_FIRST_START,
+        BLOCK_SECOND_START,
+        BLOCK_THIRD_START,
+        BLOCK_TIMESLOT_OLD,
+        BLOCK_TIMESLOT,
+        BLOCK_CHAT,
+        BLOCK_CHECKSUM,
+        0x23,
+        BLOCK_FORCED_END,
+    )
+)
+_find_known_block = re.compile(b"[" + re.escape(_KNOWN_BLOCK_IDS) + b"]").search
+
+# Leave result codes; unknown codes are recorded as a plain leave
+_LEAVE_RESULTS = {result.value: result for result in LeaveResult}
+
 
 class W3GParser:
     """Main parser for W3G replay files."""
 
-    def __init__(self, strict: bool = False):
+    def __init__(
+        self,
+        strict: bool = False,
+        emit_noise_actions: bool = True,
+        keep_payloads: bool = True,
+        decompress_workers: int = 1,
+        parse_actions: bool = True,
+        keep_raw: bool = True,
+    ):
         """Initialize parser.
 
         Args:
             strict: If True, raise errors on unknown data. If False, skip and log.
+            emit_noise_actions: If False, skip bookkeeping actions (selection
+                sync, menus, cheats, ...) while parsing. They are then left out
+                of the action list and of player action counts.
+            keep_payloads: If False, don't keep the raw bytes of each action
+                (GameAction.payload is left empty). Parsed fields are unaffected.
+            decompress_workers: Number of threads used to inflate the data
+                blocks of large replays. The default inflates them serially.
+            parse_actions: If False, skip decoding player actions, which is
+                most of the parsing work. The replay then has no actions and
+                every player's action count (and APM) is 0; chat, players,
+                settings and leave results are parsed as usual.
+            keep_raw: If False, don't keep the decompressed replay data
+                (W3GReplay.raw_decompressed is left empty) so it can be freed
+                once parsing is done.
         """
         self.strict = strict
+        self.emit_noise_actions = emit_noise_actions
+        self.keep_payloads = keep_payloads
+        self.decompress_workers = decompress_workers
+        self.parse_actions = parse_actions
+        self.keep_raw = keep_raw
 
     def parse(self, filepath: str | Path) -> W3GReplay:
         """Parse a complete replay file.
@@ -66,8 +123,22 @@ class W3GParser:
             FileNotFoundError: If file doesn't exist
         """
         filepath = Path(filepath)
-        with open(filepath, "rb") as f:
-            return self.parse_stream(f)
+        # Unbuffered: the whole file is read through the mapping, so a read
+        # buffer would only be allocated and filled for nothing
+        with open(filepath, "rb", buffering=0) as f:
+            try:
+                mapped = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+            except (OSError, ValueError):
+                # Empty files, pipes and the like can't be mapped
+                return self.parse_stream(BufferedReader(f))
+
+            with mapped:
+                header = parse_header_from_bytes(mapped)
+                decompressed = decompress_buffer(
+                    mapped, header.header_size, header, self.decompress_workers
+                )
+
+        return self._parse_game_data(header, decompressed)
 
     def parse_stream(self, stream: BinaryIO) -> W3GReplay:
         """Parse a replay from a binary stream.
@@ -85,7 +156,7 @@ class W3GParser:
         stream.seek(header.header_size)
 
         # 3. Decompress all blocks
-        decompressed = decompress_blocks(stream, header)
+        decompressed = decompress_blocks(stream, header, self.decompress_workers)
 
         # 4. Parse game data
         return self._parse_game_data(header, decompressed)
@@ -99,8 +170,7 @@ class W3GParser:
         Returns:
             Parsed ReplayHeader
         """
-        with open(filepath, "rb") as f:
-            return parse_header(f)
+        return parse_header_from_file(filepath)
 
     def iter_actions(self, filepath: str | Path) -> Iterator[GameAction]:
         """Iterate actions without loading all into memory.
@@ -154,11 +224,11 @@ class W3GParser:
             host_name = host_player.name
 
         # Parse game name (null-terminated)
-        game_name_start = offset
-        while offset < len(data) and data[offset] != 0:
-            offset += 1
-        game_name = data[game_name_start:offset].decode("utf-8", errors="replace")
-        offset += 1  # Skip null
+        game_name_end = data.find(b"\x00", offset)
+        if game_name_end == -1:
+            game_name_end = max(offset, len(data))
+        game_name = data[offset:game_name_end].decode("utf-8", errors="replace")
+        offset = game_name_end + 1  # Skip null
 
         # Skip another null byte (separator)
         if offset < len(data) and data[offset] == 0:
@@ -196,21 +266,20 @@ class W3GParser:
             """Check if offset points to a valid GameStartRecord."""
             if o + 4 > len(d) or d[o] != 0x19:
                 return False
-            num_bytes = struct.unpack_from("<H", d, o + 1)[0]
+            num_bytes = _U16(d, o + 1)[0]
             if num_bytes < 10 or num_bytes > 500:  # Reasonable range
                 return False
             num_slots = d[o + 3]
             return 2 <= num_slots <= 24
 
         if offset < len(data) and not is_valid_game_start_record(data, offset):
-            # Search for valid GameStartRecord marker
-            search_offset = offset
-            while search_offset < len(data) - 4:
-                if data[search_offset] == 0x19:
-                    if is_valid_game_start_record(data, search_offset):
-                        break
-                search_offset += 1
-            if search_offset < len(data) and is_valid_game_start_record(data, search_offset):
+            # Search for valid GameStartRecord marker (a record needs at
+            # least 4 bytes, so the last candidate is len(data) - 4)
+            search_end = len(data) - 3
+            search_offset = data.find(b"\x19", offset, search_end)
+            while search_offset != -1 and not is_valid_game_start_record(data, search_offset):
+                search_offset = data.find(b"\x19", search_offset + 1, search_end)
+            if search_offset != -1:
                 offset = search_offset
 
         # Parse GameStartRecord (0x19)
@@ -221,63 +290,46 @@ class W3GParser:
             # Apply slot info to players
             apply_slot_info_to_players(players, slots, header.version)
 
-        # Parse replay data blocks
-        while offset < len(data):
-            if offset >= len(data):
-                break
+        # Index the final player list for per-action lookups; the first
+        # record with an ID wins, as with a scan of the list
+        players_by_id: dict[int, PlayerInfo] = {}
+        for player in players:
+            players_by_id.setdefault(player.id, player)
 
+        # Actions per player ID (IDs are single bytes), stored on the
+        # players once the data has been walked
+        action_counts = [0] * 256
+        append_action = actions.append
+
+        # Parse replay data blocks. TimeSlots make up nearly all of the
+        # data, so they are tested first.
+        while offset < len(data):
             block_id = data[offset]
             offset += 1
 
-            if block_id == BLOCK_LEAVE_GAME:
-                # 14 bytes total: reason (4) + player_id (1) + result (4) + unknown (4)
-                if offset + 13 <= len(data):
-                    reason = struct.unpack_from("<I", data, offset)[0]
-                    offset += 4
-                    leave_player_id = data[offset]
-                    offset += 1
-                    result = struct.unpack_from("<I", data, offset)[0]
-                    offset += 4
-                    offset += 4  # Unknown
-
-                    # Update player leave info
-                    for player in players:
-                        if player.id == leave_player_id:
-                            try:
-                                player.leave_result = LeaveResult(result)
-                            except ValueError:
-                                player.leave_result = LeaveResult.LEFT
-                            player.leave_time_ms = current_time_ms
-                            break
-
-            elif block_id in (BLOCK_FIRST_START, BLOCK_SECOND_START, BLOCK_THIRD_START):
-                # 5 bytes: unknown dword (always 0x01)
-                offset += 4
-
-            elif block_id in (BLOCK_TIMESLOT, BLOCK_TIMESLOT_OLD):
+            if block_id in (BLOCK_TIMESLOT, BLOCK_TIMESLOT_OLD):
                 # TimeSlot block
                 if offset + 4 <= len(data):
-                    num_bytes = struct.unpack_from("<H", data, offset)[0]
-                    offset += 2
-                    time_increment = struct.unpack_from("<H", data, offset)[0]
-                    offset += 2
+                    num_bytes, time_increment = _TIMESLOT_HEADER(data, offset)
+                    offset += 4
 
                     current_time_ms += time_increment
 
                     # Parse command data (num_bytes - 2 for time increment already read)
                     if num_bytes > 2:
                         cmd_length = num_bytes - 2
-                        for player_id, action in parse_command_data(
-                            data, offset, cmd_length, header.version
-                        ):
-                            action.timestamp_ms = current_time_ms
-                            actions.append(action)
-
-                            # Update player action count
-                            for player in players:
-                                if player.id == player_id:
-                                    player.action_count += 1
-                                    break
+                        if self.parse_actions:
+                            for player_id, action in parse_command_data(
+                                data,
+                                offset,
+                                cmd_length,
+                                header.version,
+                                self.emit_noise_actions,
+                                current_time_ms,
+                                self.keep_payloads,
+                            ):
+                                append_action(action)
+                                action_counts[player_id] += 1
 
                         offset += cmd_length
 
@@ -288,6 +340,22 @@ class W3GParser:
                     chat_msg.timestamp_ms = current_time_ms
                     chat_messages.append(chat_msg)
 
+            elif block_id == BLOCK_LEAVE_GAME:
+                # 14 bytes total: reason (4) + player_id (1) + result (4) + unknown (4)
+                if offset + 13 <= len(data):
+                    reason, leave_player_id, result = _LEAVE_GAME(data, offset)
+                    offset += 13
+
+                    # Update player leave info
+                    player = players_by_id.get(leave_player_id)
+                    if player is not None:
+                        player.leave_result = _LEAVE_RESULTS.get(result, LeaveResult.LEFT)
+                        player.leave_time_ms = current_time_ms
+
+            elif block_id in (BLOCK_FIRST_START, BLOCK_SECOND_START, BLOCK_THIRD_START):
+                # 5 bytes: unknown dword (always 0x01)
+                offset += 4
+
             elif block_id == BLOCK_CHECKSUM:
                 # Checksum block: 1 byte length + data
                 if offset < len(data):
@@ -307,14 +375,17 @@ class W3GParser:
             else:
                 # Unknown block - try to continue
                 logger.debug(f"Unknown block 0x{block_id:02X} at offset {offset - 1}")
-                # Try to skip by looking for next valid block ID
+                if self.strict:
+                    break
+                # Skip ahead to the next byte that is a known block ID.
                 # This is risky but better than crashing
-                if not self.strict:
-                    continue
-                break
+                match = _find_known_block(data, offset)
+                offset = match.start() if match else len(data)
 
-        # Calculate APM for each player
+        # Store action counts and calculate APM for each player
         duration_minutes = header.duration_ms / 60000.0
+        for player_id, player in players_by_id.items():
+            player.action_count += action_counts[player_id]
         if duration_minutes > 0:
             for player in players:
                 player.apm = player.action_count / duration_minutes
@@ -329,7 +400,7 @@ class W3GParser:
             players=players,
             chat_messages=chat_messages,
             actions=actions,
-            raw_decompressed=data,
+            raw_decompressed=data if self.keep_raw else b"",
         )
 
     def _parse_encoded_settings(
@@ -389,20 +460,21 @@ class W3GParser:
 
         # Map path
         path_start = offset
-        while offset < len(encoded_data) and encoded_data[offset] != 0:
-            offset += 1
+        offset = encoded_data.find(b"\x00", path_start)
+        if offset == -1:
+            offset = len(encoded_data)
         if offset > path_start:
             map_path = encoded_data[path_start:offset].decode("utf-8", errors="replace")
             # Extract map name from path
             if "/" in map_path:
-                map_name = map_path.rsplit("/", 1)[-1]
+                map_name = map_path.rpartition("/")[2]
             elif "\\" in map_path:
-                map_name = map_path.rsplit("\\", 1)[-1]
+                map_name = map_path.rpartition("\\")[2]
             else:
                 map_name = map_path
 
-            # Remove .w3x or .w3m extension
-            if map_name.lower().endswith((".w3x", ".w3m")):
+            # Remove .w3x or .w3m extension (only the suffix needs lowercasing)
+            if map_name[-4:].lower() in (".w3x", ".w3m"):
                 map_name = map_name[:-4]
 
         offset += 1  # Skip null
@@ -15,6 +15,34 @@ from w3g_parser.models import PlayerInfo, Race, SlotStatus
 
 logger = logging.getLogger(__name__)
 
+# Precompiled unpackers for the fixed-width fields of player and lobby records
+_U16 = struct.Struct("<H").unpack_from
+_U32 = struct.Struct("<I").unpack_from
+# Ladder player record extra data: runtime (ms), race flags
+_LADDER_INFO = struct.Struct("<II").unpack_from
+
+# Slot record fields in record order; older versions stop after race flags
+# (7 bytes, before v1.03) or AI strength (8 bytes, before v1.07)
+_SLOT_FIELDS = (
+    "player_id",
+    "download_percent",
+    "slot_status",
+    "is_computer",
+    "team",
+    "color",
+    "race_flags",
+    "ai_strength",
+    "handicap",
+)
+_SLOT_RECORDS = {size: struct.Struct(f"<{size}B") for size in (7, 8, 9)}
+
+# For each control byte, a little-endian word with 1 in every byte position
+# its bits 1-7 mark as encoded (bit=0) in the 7 bytes that follow it
+_ENCODED_BYTE_MASKS = tuple(
+    sum(1 << (8 * bit) for bit in range(7) if not control & (1 << (bit + 1)))
+    for control in range(256)
+)
+
 
 def decode_encoded_string(data: bytes, offset: int) -> tuple[bytes, int]:
     """Decode the encoded string format used in W3G.
@@ -33,11 +61,10 @@ def decode_encoded_string(data: bytes, offset: int) -> tuple[bytes, int]:
     """
     result = bytearray()
     pos = offset
+    data_len = len(data)
 
-    while pos < len(data):
+    while pos < data_len:
         # Read control byte
-        if pos >= len(data):
-            break
         control = data[pos]
         pos += 1
 
@@ -45,26 +72,28 @@ def decode_encoded_string(data: bytes, offset: int) -> tuple[bytes, int]:
             # End of encoded string
             break
 
-        # Process next 7 bytes based on control bits
-        for bit in range(7):
-            if pos >= len(data):
-                break
-
-            byte = data[pos]
-            pos += 1
-
-            if byte == 0:
-                # End of string
-                result.append(0)
-                return bytes(result), pos
-
-            # Check if this byte is encoded (bit is 0) or literal (bit is 1)
-            if (control & (1 << (bit + 1))) == 0:
-                # Encoded: subtract 1
-                result.append(byte - 1)
-            else:
-                # Literal
-                result.append(byte)
+        # Process the next 7 bytes (fewer at the end of the data); a null
+        # byte among them ends the string
+        group_end = min(pos + 7, data_len)
+        terminator = data.find(b"\x00", pos, group_end)
+        if terminator != -1:
+            group_end = terminator
+
+        size = group_end - pos
+        mask = _ENCODED_BYTE_MASKS[control] & ((1 << (8 * size)) - 1)
+        if mask:
+            # Subtract 1 from every encoded byte at once; none of them is 0,
+            # so no byte borrows from the next
+            value = int.from_bytes(data[pos:group_end], "little") - mask
+            result += value.to_bytes(size, "little")
+        else:
+            result += data[pos:group_end]
+
+        if terminator != -1:
+            # End of string
+            result.append(0)
+            return bytes(result), terminator + 1
+        pos = group_end
 
     return bytes(result), pos
 
@@ -107,8 +136,9 @@ def parse_player_record(data: bytes, offset: int, is_host: bool = False) -> tupl
 
     # Read player name (null-terminated)
     name_start = offset
-    while offset < len(data) and data[offset] != 0:
-        offset += 1
+    offset = data.find(b"\x00", name_start)
+    if offset == -1:
+        offset = len(data)
     name = data[name_start:offset].decode("utf-8", errors="replace")
     offset += 1  # Skip null terminator
 
@@ -128,10 +158,8 @@ def parse_player_record(data: bytes, offset: int, is_host: bool = False) -> tupl
     elif extra_size == 0x08:
         # Ladder game: 4 bytes runtime + 4 bytes race flags
         if offset + 8 <= len(data):
-            runtime_ms = struct.unpack_from("<I", data, offset)[0]
-            offset += 4
-            race_flags = struct.unpack_from("<I", data, offset)[0]
-            offset += 4
+            runtime_ms, race_flags = _LADDER_INFO(data, offset)
+            offset += 8
             race = Race.from_flags(race_flags)
     else:
         # Unknown format, skip reported bytes
@@ -168,35 +196,31 @@ def parse_slot_record(data: bytes, offset: int, version: int) -> tuple[dict, int
     Returns:
         Tuple of (slot dict, new offset)
     """
-    slot = {}
+    slot_size = _slot_record_size(version)
+
+    if offset + slot_size > len(data):
+        return {}, offset
+
+    return _slot_from_fields(_SLOT_RECORDS[slot_size].unpack_from(data, offset)), offset + slot_size
 
-    # Determine slot size based on version
+
+def _slot_record_size(version: int) -> int:
+    """Get the size of a slot record for a game version."""
     if version < 3:
-        slot_size = 7
-    elif version < 7:
-        slot_size = 8
-    else:
-        slot_size = 9
+        return 7
+    if version < 7:
+        return 8
+    return 9
 
-    if offset + slot_size > len(data):
-        return slot, offset
-
-    slot["player_id"] = data[offset]
-    slot["download_percent"] = data[offset + 1]
-    slot["slot_status"] = data[offset + 2]
-    slot["is_computer"] = data[offset + 3] == 0x01
-    slot["team"] = data[offset + 4]
-    slot["color"] = data[offset + 5]
-    slot["race_flags"] = data[offset + 6]
-
-    if slot_size >= 8:
-        slot["ai_strength"] = data[offset + 7]
-    if slot_size >= 9:
-        slot["handicap"] = data[offset + 8]
-    else:
-        slot["handicap"] = 100
 
-    return slot, offset + slot_size
+def _slot_from_fields(fields: tuple[int, ...]) -> dict[str, int]:
+    """Build a slot dict from the unpacked bytes of one slot record."""
+    # Records before v1.07 are shorter than the field list and stop early
+    slot = dict(zip(_SLOT_FIELDS, fields, strict=False))
+    slot["is_computer"] = slot["is_computer"] == 0x01
+    # Handicap is only recorded from v1.07 on
+    slot.setdefault("handicap", 100)
+    return slot
 
 
 def parse_game_start_record(
@@ -230,7 +254,7 @@ def parse_game_start_record(
         return [], 0, 0, offset
 
     # Number of following bytes
-    num_bytes = struct.unpack_from("<H", data, offset)[0]
+    num_bytes = _U16(data, offset)[0]
     offset += 2
 
     if offset >= len(data):
@@ -240,17 +264,19 @@ def parse_game_start_record(
     num_slots = data[offset]
     offset += 1
 
-    # Parse slot records
-    slots = []
-    for _ in range(num_slots):
-        slot, offset = parse_slot_record(data, offset, version)
-        if slot:
-            slots.append(slot)
+    # Parse the slot records that fit in the data in one pass
+    slot_size = _slot_record_size(version)
+    slots_end = offset + min(num_slots, (len(data) - offset) // slot_size) * slot_size
+    slots = [
+        _slot_from_fields(fields)
+        for fields in _SLOT_RECORDS[slot_size].iter_unpack(data[offset:slots_end])
+    ]
+    offset = slots_end
 
     # Random seed
     random_seed = 0
     if offset + 4 <= len(data):
-        random_seed = struct.unpack_from("<I", data, offset)[0]
+        random_seed = _U32(data, offset)[0]
         offset += 4
 
     # Select mode
@@ -313,7 +339,7 @@ def apply_slot_info_to_players(
             player.team = slot.get("team", 0)
             player.color = slot.get("color", 0)
             player.handicap = slot.get("handicap", 100)
-            player.slot_status = SlotStatus(slot_status)
+            player.slot_status = SlotStatus.USED
 
             # Set race if not already set from ladder info
             if player.race == Race.UNKNOWN:
@@ -0,0 +1,243 @@
+"""Tests for action parsing."""
+
+import dataclasses
+import json
+import pickle
+import struct
+
+from w3g_parser import actions
+from w3g_parser.actions import decode_item_id, parse_action, parse_command_data
+
+
+def test_parse_fixed_size_action():
+    """Test that a 1-byte action is parsed and consumed."""
+    action, offset = parse_action(b"\x01", 0, 26)
+
+    assert action is not None
+    assert action.action_name == "pause"
+    assert action.payload == b"\x01"
+    assert offset == 1
+
+
+def test_parse_ability_target_position():
+    """Test parsing of an ability with target coordinates (v1.13+ layout)."""
+    data = (
+        b"\x11"
+        + b"\x40\x00"  # ability flags
+        + b"oofh"  # item ID (reversed 'hfoo')
+        + b"\xff" * 8  # unknowns
+        + struct.pack("<ff", 100.0, -200.0)
+    )
+    action, offset = parse_action(data, 0, 26)
+
+    assert action is not None
+    assert action.action_name == "ability_position"
+    assert action.data["ability_flags"] == 0x40
+    assert action.data["item_id"] == b"oofh"
+    assert action.data["target_x"] == 100.0
+    assert action.data["target_y"] == -200.0
+    assert offset == len(data)
+
+
+def test_parse_change_selection():
+    """Test parsing of a unit selection with object IDs."""
+    data = b"\x16\x01\x02\x00" + struct.pack("<IIII", 10, 10, 20, 20)
+    action, offset = parse_action(data, 0, 26)
+
+    assert action is not None
+    assert action.data["select_mode"] == 1
+    assert action.data["unit_count"] == 2
+    assert action.data["object_ids"] == [10, 20]
+    assert offset == len(data)
+
+
+def test_parse_cheat_action():
+    """Test that cheat actions are named and skipped."""
+    action, offset = parse_action(b"\x20" + b"\x00" * 5, 0, 26)
+
+    assert action is not None
+    assert action.action_name == "cheat"
+    assert offset == 6
+
+
+def test_parse_cheat_action_range():
+    """Test the last cheat ID and a cheat cut short by the end of the data."""
+    action, offset = parse_action(b"\x32" + b"\x00" * 2, 0, 26)
+
+    assert action is not None
+    assert action.action_name == "cheat"
+    assert offset == 3
+    assert parse_action(b"\x33\x00", 0, 26)[0] is None
+
+
+def test_parse_unknown_action():
+    """Test that unknown actions stop parsing."""
+    action, offset = parse_action(b"\xfe\x00\x00", 0, 26)
+
+    assert action is None
+    assert offset == 1
+
+
+def test_parse_command_data():
+    """Test parsing a CommandData block with multiple actions."""
+    actions = b"\x01" + b"\x18\x03\xff"
+    data = b"\x02" + struct.pack("<H", len(actions)) + actions
+
+    parsed = parse_command_data(data, 0, len(data), 26)
+
+    assert [player_id for player_id, _ in parsed] == [2, 2]
+    assert [action.action_name for _, action in parsed] == ["pause", "select_group"]
+    assert parsed[1][1].data["group"] == 3
+
+
+def test_parse_action_from_bytearray():
+    """Test that fields parsed from a bytearray buffer are immutable bytes."""
+    data = bytearray(b"\x10\x00\x00" + b"oofh" + b"\x00" * 7)
+    action, offset = parse_action(data, 0, 26)
+
+    assert action is not None
+    assert type(action.data["item_id"]) is bytes
+    assert type(action.payload) is bytes
+    assert offset == len(data)
+
+
+def test_parse_trigger_command():
+    """Test reading the null-terminated string of a trigger command."""
+    data = b"\x60" + b"\x00" * 8 + b"-ar\x00" + b"\x01"
+    action, offset = parse_action(data, 0, 26)
+
+    assert action is not None
+    assert action.data["command"] == "-ar"
+    assert offset == len(data) - 1
+
+
+def test_parse_unterminated_save_game():
+    """Test that an unterminated filename runs to the end of the data."""
+    action, offset = parse_action(b"\x06save", 0, 26)
+
+    assert action is not None
+    assert action.data["filename"] == "save"
+    assert action.payload == b"\x06save"
+
+
+def test_parse_ability_pre_113_layout():
+    """Test that versions before 1.13 read a 1-byte ability flags field."""
+    data = b"\x10" + b"\x40" + b"oofh" + b"\x00" * 7
+    action, offset = parse_action(data, 0, 12)
+
+    assert action is not None
+    assert action.data["ability_flags"] == 0x40
+    assert action.data["item_id"] == b"oofh"
+    assert offset == len(data)
+
+
+def test_parse_command_data_without_noise_actions():
+    """Test that bookkeeping actions can be skipped without stopping the block."""
+    actions = b"\x19\x00" + b"\x1a" + b"\x01" + b"\x20" + b"\x00" * 5 + b"\x02"
+    data = b"\x02" + struct.pack("<H", len(actions)) + actions
+
+    parsed = parse_command_data(data, 0, len(data), 12, emit_noise_actions=False)
+
+    assert [action.action_name for _, action in parsed] == [
+        "select_subgroup",
+        "pause",
+        "resume",
+    ]
+
+
+def test_parse_command_data_sets_player_and_timestamp():
+    """Test that actions are created with their player ID and timestamp."""
+    data = b"\x03" + struct.pack("<H", 1) + b"\x01"
+
+    [(player_id, action)] = parse_command_data(data, 0, len(data), 26, timestamp_ms=1500)
+
+    assert player_id == 3
+    assert action.player_id == 3
+    assert action.timestamp_ms == 1500
+
+
+def test_parse_large_truncated_selection():
+    """Test that long selections keep every whole unit that fits in the data."""
+    units = b"".join(struct.pack("<II", i, i) for i in range(30))
+    data = b"\x16\x01" + struct.pack("<H", 40) + units + b"\x00\x00\x00"
+    action, offset = parse_action(data, 0, 26)
+
+    assert action is not None
+    assert action.data["unit_count"] == 40
+    assert action.data["object_ids"] == list(range(30))
+    assert offset == len(data) - 3
+
+
+def test_action_without_fields_has_plain_dict():
+    """Test that actions without fields get their own JSON-serializable dict."""
+    action, _ = parse_action(b"\x01", 0, 26)
+    [(_, other)] = parse_command_data(b"\x02\x01\x00\x01", 0, 4, 26)
+
+    assert type(action.data) is dict
+    assert json.dumps(action.data) == "{}"
+    assert json.loads(json.dumps(dataclasses.asdict(action), default=bytes.hex))["data"] == {}
+    assert pickle.loads(pickle.dumps(action)) == action
+
+    action.data["note"] = "mutable"
+    assert other.data == {}
+
+
+def test_decode_item_id():
+    """Test decoding of string, numeric and invalid item IDs."""
+    assert decode_item_id(b"oofh") == "Footman"
+    assert decode_item_id(b"zyxw") == "wxyz"
+    assert decode_item_id(b"a\x00\x00\x00") == "a"
+    assert decode_item_id(b"\x03\x00\x0d\x00") == "Right-click / Smart"
+    assert decode_item_id(b"ab-c") == "61622d63"
+    assert decode_item_id(b"1_b\x00") == "b_1"
+    assert decode_item_id(b"a\x00b\x00") == "b\x00a"
+    assert decode_item_id(b"\xe9abc") == "e9616263"
+
+
+def test_parse_command_data_without_payloads():
+    """Test that payloads can be dropped while fields are still parsed."""
+    data = b"\x02" + struct.pack("<H", 3) + b"\x18\x03\xff"
+
+    [(_, action)] = parse_command_data(data, 0, len(data), 26, keep_payloads=False)
+
+    assert action.payload == b""
+    assert action.data["group"] == 3
+
+
+def test_parse_ability_flags_width_by_version():
+    """Test that ability flags are a little-endian word on 1.13+ and a byte before."""
+    body = b"\x42\x01" + b"oofh" + b"\x00" * 8
+
+    new_action, _ = parse_action(b"\x10" + body, 0, 13)
+    old_action, _ = parse_action(b"\x10" + body, 0, 12)
+
+    assert new_action.data["ability_flags"] == 0x0142
+    assert new_action.data["item_id"] == b"oofh"
+    assert old_action.data["ability_flags"] == 0x42
+    assert old_action.data["item_id"] == b"\x01oof"
+
+
+def test_parse_select_subgroup_size_by_version():
+    """Test that subgroup selections carry 12 bytes from 1.14b on and 1 byte before."""
+    data = b"\x19" + b"\x00" * 12
+
+    assert parse_action(data, 0, 14)[1] == 13
+    assert parse_action(data, 0, 13)[1] == 2
+
+
+def test_parse_large_selection_without_native_view(monkeypatch):
+    """Test the iter_unpack path used when native dwords aren't little-endian."""
+    monkeypatch.setattr(actions, "_NATIVE_LITTLE_ENDIAN", False)
+    units = b"".join(struct.pack("<II", i, 0xFFFFFFFF) for i in range(30))
+    data = b"\x17\x04" + struct.pack("<H", 30) + units
+    action, offset = parse_action(data, 0, 26)
+
+    assert action is not None
+    assert action.data["group"] == 4
+    assert action.data["object_ids"] == list(range(30))
+    assert offset == len(data)
+
+
+def test_action_names_are_lowercase():
+    """Test that action names are lowercase, which the CLI filter relies on."""
+    assert all(name == name.lower() for name in actions._ACTION_NAME_TABLE)
@@ -0,0 +1,32 @@
+"""Tests for chat message parsing."""
+
+import struct
+
+from w3g_parser.chat import parse_chat_message
+
+
+def test_parse_chat_message():
+    """Test parsing a normal chat message with its mode."""
+    message = b"gl hf\x00"
+    data = b"\x02" + struct.pack("<H", len(message) + 5) + b"\x20" + struct.pack("<I", 1) + message
+
+    chat, offset = parse_chat_message(data, 0, {2: "Grubby"})
+
+    assert chat is not None
+    assert chat.player_name == "Grubby"
+    assert chat.message == "gl hf"
+    assert chat.mode == 1
+    assert offset == len(data)
+
+
+def test_parse_unterminated_chat_message():
+    """Test that an unterminated message runs to the end of the data."""
+    data = b"\x03" + struct.pack("<H", 3) + b"\x10" + b"hi"
+
+    chat, offset = parse_chat_message(data, 0, {})
+
+    assert chat is not None
+    assert chat.is_startup
+    assert chat.message == "hi"
+    assert chat.player_name == "Player 3"
+    assert offset == len(data) + 1
@@ -0,0 +1,80 @@
+"""Tests for the command-line interface."""
+
+import json
+from concurrent.futures import Future
+from concurrent.futures.process import BrokenProcessPool
+
+import pytest
+from click.testing import CliRunner
+
+from tests.test_parser import _game_data, _write_replay
+from w3g_parser import cli
+
+
+@pytest.fixture
+def batch_replays(tmp_path, mock_expansion_header):
+    """Two synthetic replays with an invalid file between them."""
+    invalid = tmp_path / "invalid.w3g"
+    invalid.write_bytes(b"not a replay")
+    return [
+        str(_write_replay(tmp_path, mock_expansion_header, _game_data(), "first.w3g")),
+        str(invalid),
+        str(_write_replay(tmp_path, mock_expansion_header, _game_data(b"\xee"), "second.w3g")),
+    ]
+
+
+@pytest.mark.parametrize("ndjson", [False, True])
+def test_batch_output_independent_of_workers(tmp_path, batch_replays, ndjson):
+    """Test that batch writes the same bytes with one or two worker processes."""
+    outputs = []
+    for workers in ("1", "2"):
+        output = tmp_path / f"out-{workers}.json"
+        args = ["batch", *batch_replays, "-o", str(output), "-j", workers]
+        result = CliRunner().invoke(cli.main, args + (["--ndjson"] if ndjson else []))
+
+        assert result.exit_code == 0, result.output
+        assert "Parsed 2 replays" in result.output
+        assert "(1 errors)" in result.output
+        outputs.append(output.read_bytes())
+
+    assert outputs[0] == outputs[1]
+    if ndjson:
+        sources = [json.loads(line)["_source_file"] for line in outputs[0].splitlines()]
+    else:
+        sources = [replay["_source_file"] for replay in json.loads(outputs[0])]
+    assert sources == [batch_replays[0], batch_replays[2]]
+
+
+class _BrokenPool:
+    """Process pool stand-in whose worker dies on the first replay."""
+
+    def __init__(self, max_workers):
+        self.submitted = 0
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        return None
+
+    def submit(self, fn, *args):
+        self.submitted += 1
+        if self.submitted > 1:
+            raise BrokenProcessPool("pool is broken")
+        future = Future()
+        future.set_exception(BrokenProcessPool("worker died"))
+        return future
+
+
+def test_batch_reports_broken_pool(tmp_path, batch_replays, monkeypatch):
+    """Test that a broken pool fails each replay and still closes the JSON array."""
+    monkeypatch.setattr(cli, "ProcessPoolExecutor", _BrokenPool)
+    output = tmp_path / "out.json"
+
+    result = CliRunner().invoke(cli.main, ["batch", *batch_replays, "-o", str(output), "-j", "2"])
+
+    assert result.exit_code == 0, result.output
+    assert f"Error parsing {batch_replays[0]}: worker died" in result.output
+    assert f"Error parsing {batch_replays[2]}: pool is broken" in result.output
+    assert "(3 errors)" in result.output
+    assert json.loads(output.read_text()) == []
@@ -0,0 +1,80 @@
+"""Tests for block decompression."""
+
+import io
+import struct
+import zlib
+
+import pytest
+
+from w3g_parser import decompressor
+from w3g_parser.decompressor import (
+    decompress_blocks,
+    decompress_buffer,
+    decompress_single_block,
+)
+from w3g_parser.exceptions import DecompressionError, TruncatedDataError
+from w3g_parser.header import parse_header_from_bytes
+
+
+def _classic_block(raw: bytes) -> bytes:
+    compressor = zlib.compressobj(wbits=-15)
+    compressed = compressor.compress(raw) + compressor.flush(zlib.Z_SYNC_FLUSH)
+    return struct.pack("<HHI", len(compressed), len(raw), 0) + compressed
+
+
+def test_decompress_sync_flushed_block():
+    """Test that a raw deflate block ending on a sync flush is accepted."""
+    raw = b"game data " * 100
+    compressor = zlib.compressobj(wbits=-15)
+    block = compressor.compress(raw) + compressor.flush(zlib.Z_SYNC_FLUSH)
+
+    assert decompress_single_block(block) == raw
+
+
+def test_decompress_single_block_falls_back_to_other_format():
+    """Test that a zlib-wrapped block still decompresses when raw deflate is requested."""
+    raw = b"reforged data " * 50
+
+    assert decompress_single_block(zlib.compress(raw)) == raw
+    assert decompress_single_block(zlib.compress(raw), use_zlib_header=True) == raw
+
+
+def test_decompress_buffer_matches_stream(mock_expansion_header):
+    """Test that blocks sliced from a buffer decompress like blocks read from a stream."""
+    header = parse_header_from_bytes(mock_expansion_header)
+    data = mock_expansion_header + _classic_block(b"\x1f" * 300)
+
+    stream = io.BytesIO(data)
+    stream.seek(header.header_size)
+
+    assert decompress_buffer(data, header.header_size, header) == b"\x1f" * 300
+    assert decompress_blocks(stream, header) == b"\x1f" * 300
+
+
+def test_decompress_buffer_truncated_block(mock_expansion_header):
+    """Test that a block cut short by the end of the buffer is reported at the end."""
+    header = parse_header_from_bytes(mock_expansion_header)
+    data = mock_expansion_header + _classic_block(b"\x1f" * 300)[:-2]
+
+    with pytest.raises(TruncatedDataError, match="Block 0 data truncated") as excinfo:
+        decompress_buffer(data, header.header_size, header)
+
+    assert excinfo.value.offset == len(data)
+
+
+def test_decompress_buffer_with_threads(monkeypatch, mock_expansion_header):
+    """Test that blocks inflated on threads keep their order and report bad blocks."""
+    monkeypatch.setattr(decompressor, "PARALLEL_MIN_BLOCKS", 0)
+    header = parse_header_from_bytes(mock_expansion_header)
+    header.num_compressed_blocks = 3
+    blocks = [_classic_block(bytes([i]) * 100) for i in range(3)]
+    data = mock_expansion_header + b"".join(blocks)
+
+    assert decompress_buffer(data, header.header_size, header, workers=2) == b"".join(
+        bytes([i]) * 100 for i in range(3)
+    )
+
+    bad_block = blocks[1][:8] + b"\xff" * (len(blocks[1]) - 8)
+    corrupt = mock_expansion_header + blocks[0] + bad_block + blocks[2]
+    with pytest.raises(DecompressionError, match="Block 1 decompression failed"):
+        decompress_buffer(corrupt, header.header_size, header, workers=2)
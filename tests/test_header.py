@@ -3,7 +3,7 @@
 import io
 import pytest
 
-from w3g_parser.header import parse_header, parse_header_from_bytes
+from w3g_parser.header import parse_header, parse_header_from_bytes, parse_header_from_file
 from w3g_parser.exceptions import InvalidHeaderError, TruncatedDataError
 
 
@@ -68,3 +68,41 @@ def test_parse_real_replay(sample_replay_path):
     assert header.header_version in (0, 1)
     assert header.num_compressed_blocks > 0
     assert header.duration_ms > 0
+
+
+def test_parse_header_from_file_cache(tmp_path, mock_classic_header, mock_expansion_header):
+    """Test that cached headers are copies and follow changes to the file."""
+    path = tmp_path / "replay.w3g"
+    path.write_bytes(mock_classic_header)
+
+    first = parse_header_from_file(path)
+    first.version = 0
+    assert parse_header_from_file(path).version == 0x0106
+
+    path.write_bytes(mock_expansion_header)
+    assert parse_header_from_file(path).version == 26
+
+
+def test_parse_header_leaves_stream_after_header(mock_classic_header):
+    """Test that the shorter v0 header leaves the stream right after it."""
+    stream = io.BytesIO(mock_classic_header + b"\x01\x02\x03\x04\x05")
+
+    parse_header(stream)
+
+    assert stream.tell() == len(mock_classic_header)
+
+
+def test_parse_header_from_bytes_ignores_trailing_data(mock_expansion_header):
+    """Test that a whole replay can be passed and raw_header covers only the header."""
+    header = parse_header_from_bytes(mock_expansion_header + b"\x00" * 100)
+
+    assert header.raw_header == mock_expansion_header
+
+
+def test_unknown_header_version(mock_expansion_header):
+    """Test that header versions other than 0 and 1 are rejected."""
+    data = bytearray(mock_expansion_header)
+    data[0x24] = 2
+
+    with pytest.raises(InvalidHeaderError, match="Unknown header version: 2"):
+        parse_header_from_bytes(bytes(data))
@@ -0,0 +1,33 @@
+"""Tests for data models."""
+
+import json
+
+from w3g_parser.models import Race, dump_json
+
+
+def test_dump_json_layouts():
+    """Test that dump_json matches the json module's indented and compact layouts."""
+    data = {"name": "Grübby", "apm": 212.5, "players": [{"id": 2}], "empty": {}, "none": None}
+
+    assert dump_json(data) == json.dumps(data, indent=2, ensure_ascii=False)
+    assert dump_json(data, indent=None) == json.dumps(
+        data, ensure_ascii=False, separators=(",", ":")
+    )
+    assert dump_json(data, indent=4) == json.dumps(data, indent=4, ensure_ascii=False)
+
+
+def test_dump_json_falls_back_for_unsupported_data():
+    """Test that data orjson rejects is still serialized by the json module."""
+    data = {1: "slot", "id": 1 << 70}
+
+    assert dump_json(data) == json.dumps(data, indent=2, ensure_ascii=False)
+    assert dump_json(data, indent=None) == '{"1":"slot","id":1180591620717411303424}'
+
+
+def test_race_from_flags():
+    """Test that the first race flag set wins and unknown bits are ignored."""
+    assert Race.from_flags(0x04) == Race.NIGHT_ELF
+    assert Race.from_flags(0x41) == Race.HUMAN
+    assert Race.from_flags(0x60) == Race.RANDOM
+    assert Race.from_flags(0x110) == Race.UNKNOWN
+    assert Race.from_flags(0) == Race.UNKNOWN
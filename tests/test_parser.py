@@ -1,8 +1,82 @@
 """Tests for the main parser."""
 
+import struct
+import zlib
+from pathlib import Path
+
 import pytest
 
 from w3g_parser import W3GParser, W3GReplay
+from w3g_parser.exceptions import TruncatedDataError
+from w3g_parser.models import LeaveResult, Race
+
+
+def _encode_string(raw: bytes) -> bytes:
+    """Encode bytes in the replay's encoded string format (null-terminated)."""
+    encoded = bytearray()
+    for start in range(0, len(raw), 7):
+        control = 0x01
+        group = bytearray()
+        for bit, byte in enumerate(raw[start : start + 7]):
+            if byte % 2:
+                control |= 1 << (bit + 1)
+                group.append(byte)
+            else:
+                group.append(byte + 1)
+        encoded.append(control)
+        encoded += group
+    return bytes(encoded) + b"\x00"
+
+
+def _timeslot(time_increment: int, commands: bytes) -> bytes:
+    return b"\x1f" + struct.pack("<HH", len(commands) + 2, time_increment) + commands
+
+
+def _commands(player_id: int, actions: bytes) -> bytes:
+    return bytes([player_id]) + struct.pack("<H", len(actions)) + actions
+
+
+def _game_data(garbage: bytes = b"") -> bytes:
+    """Build the decompressed data of a small three-player TFT replay.
+
+    `garbage` is inserted between the first TimeSlot and the chat message.
+    """
+    settings = bytes([2, 0x40, 0x06, 0, 0, 0, 0, 0, 0, 1, 2, 3, 4])
+    slots = bytes(
+        [1, 100, 2, 0, 0, 0, 0x01, 1, 100]
+        + [2, 100, 2, 0, 1, 1, 0x04, 1, 100]
+        + [3, 100, 2, 0, 12, 2, 0x40, 1, 100]
+    )
+    game_start = bytes([3]) + slots + struct.pack("<I", 1234) + b"\x03\x02"
+    return b"".join(
+        [
+            b"\x10\x01\x00\x00",
+            b"\x00\x01Host\x00\x01\x00",
+            b"My Game\x00\x00",
+            _encode_string(settings + b"\x00Maps\\(2)EchoIsles.w3x\x00Creator\x00"),
+            struct.pack("<III", 3, 1, 0),
+            b"\x16\x02Grubby\x00\x08" + struct.pack("<II", 60000, 0x04),
+            b"\x16\x03Obs\x00\x01\x00",
+            b"\x19" + struct.pack("<H", len(game_start)) + game_start,
+            b"\x1a\x01\x00\x00\x00\x1b\x01\x00\x00\x00\x1c\x01\x00\x00\x00",
+            _timeslot(100, _commands(1, b"\x01\x02") + _commands(2, b"\x18\x03\xff")),
+            garbage,
+            b"\x20\x02" + struct.pack("<H", 11) + b"\x20" + struct.pack("<I", 0) + b"gl hf\x00",
+            _timeslot(250, _commands(2, b"\x01")),
+            b"\x17" + struct.pack("<IBII", 1, 1, 0x08, 0),
+            b"\x17" + struct.pack("<IBII", 1, 2, 0x09, 0),
+            b"\x17" + struct.pack("<IBII", 1, 3, 0x42, 0),
+        ]
+    )
+
+
+def _write_replay(tmp_path, header: bytes, data: bytes, name: str = "synthetic.w3g") -> Path:
+    """Write a replay file holding `data` in one sync-flushed deflate block."""
+    compressor = zlib.compressobj(wbits=-15)
+    compressed = compressor.compress(data) + compressor.flush(zlib.Z_SYNC_FLUSH)
+    path = tmp_path / name
+    path.write_bytes(header + struct.pack("<HHI", len(compressed), len(data), 0) + compressed)
+    return path
 
 
 def test_parse_replay(sample_replay_path):
@@ -113,3 +187,99 @@ def test_player_apm(sample_replay_path):
         # If player has actions, APM should be positive
         if player.action_count > 0:
             assert player.apm > 0
+
+
+def test_parse_empty_file(tmp_path):
+    """Test that a file too small to map still fails with a header error."""
+    path = tmp_path / "empty.w3g"
+    path.write_bytes(b"")
+
+    with pytest.raises(TruncatedDataError, match="File too small for header"):
+        W3GParser().parse(path)
+
+
+def test_parse_truncated_subheader(tmp_path, mock_expansion_header):
+    """Test that a mapped file's header is read from the mapping."""
+    path = tmp_path / "short.w3g"
+    path.write_bytes(mock_expansion_header[:60])
+
+    with pytest.raises(TruncatedDataError, match="File too small for subheader"):
+        W3GParser().parse(path)
+
+
+def test_parse_synthetic_replay(tmp_path, mock_expansion_header):
+    """Test players, chat, leave results and action counts of a small replay."""
+    path = _write_replay(tmp_path, mock_expansion_header, _game_data())
+
+    replay = W3GParser().parse(path)
+
+    assert replay.game_name == "My Game"
+    assert replay.map_name == "(2)EchoIsles"
+    assert [p.name for p in replay.players] == ["Host", "Grubby", "Obs"]
+    host, grubby, obs = replay.players
+    assert grubby.race == Race.NIGHT_ELF
+    assert obs.is_observer
+    assert [(c.timestamp_ms, c.player_name, c.message) for c in replay.chat_messages] == [
+        (100, "Grubby", "gl hf")
+    ]
+    assert [(a.timestamp_ms, a.player_id, a.action_name) for a in replay.actions] == [
+        (100, 1, "pause"),
+        (100, 1, "resume"),
+        (100, 2, "select_group"),
+        (350, 2, "pause"),
+    ]
+    assert [p.action_count for p in replay.players] == [2, 2, 0]
+    assert grubby.apm == 2 / 10
+    assert (host.leave_result, host.leave_time_ms) == (LeaveResult.LOST, 350)
+    assert grubby.leave_result == LeaveResult.WON
+    assert obs.leave_result == LeaveResult.LEFT  # unknown result code
+    assert replay.raw_decompressed == _game_data()
+
+
+def test_parse_without_actions(tmp_path, mock_expansion_header):
+    """Test that skipping action decoding leaves chat, players and leaves intact."""
+    path = _write_replay(tmp_path, mock_expansion_header, _game_data())
+
+    full = W3GParser().parse(path)
+    replay = W3GParser(parse_actions=False).parse(path)
+
+    assert full.actions
+    assert replay.actions == []
+    assert all(player.action_count == 0 and player.apm == 0 for player in replay.players)
+    assert [p.name for p in replay.players] == [p.name for p in full.players]
+    assert [p.leave_result for p in replay.players] == [p.leave_result for p in full.players]
+    assert replay.chat_messages == full.chat_messages
+
+
+def test_parse_without_raw_data(tmp_path, mock_expansion_header):
+    """Test that the decompressed data can be dropped after parsing."""
+    path = _write_replay(tmp_path, mock_expansion_header, _game_data())
+
+    replay = W3GParser(keep_raw=False).parse(path)
+
+    assert replay.raw_decompressed == b""
+    assert len(replay.players) == 3
+    assert len(replay.actions) == 4
+
+
+def test_parse_skips_unknown_blocks(tmp_path, mock_expansion_header):
+    """Test that parsing resumes at the next known block ID after unknown data."""
+    clean = W3GParser().parse(_write_replay(tmp_path, mock_expansion_header, _game_data()))
+    path = _write_replay(tmp_path, mock_expansion_header, _game_data(b"\x99\x00\x55\x42\x00"))
+
+    replay = W3GParser().parse(path)
+
+    assert replay.chat_messages == clean.chat_messages
+    assert replay.actions == clean.actions
+    assert replay.players == clean.players
+
+
+def test_parse_strict_stops_at_unknown_block(tmp_path, mock_expansion_header):
+    """Test that strict parsing stops at the first unknown block."""
+    path = _write_replay(tmp_path, mock_expansion_header, _game_data(b"\x99\x20\x02"))
+
+    replay = W3GParser(strict=True).parse(path)
+
+    assert [a.timestamp_ms for a in replay.actions] == [100, 100, 100]
+    assert replay.chat_messages == []
+    assert all(player.leave_result is None for player in replay.players)
@@ -0,0 +1,47 @@
+"""Tests for player data parsing."""
+
+import struct
+
+from w3g_parser.players import decode_encoded_string, parse_game_start_record
+
+
+def test_decode_encoded_string():
+    """Test decoding of encoded and literal bytes up to the null terminator."""
+    data = b"\x05\x03\x42\x07\x00rest"
+
+    assert decode_encoded_string(data, 0) == (b"\x02\x42\x06\x00", 5)
+
+
+def test_decode_encoded_string_across_groups():
+    """Test a full literal group followed by an unterminated encoded group."""
+    data = b"\xffabcdefg" + b"\x01bc"
+
+    assert decode_encoded_string(data, 0) == (b"abcdefgab", len(data))
+    assert decode_encoded_string(b"\x00xyz", 0) == (b"", 1)
+
+
+def test_parse_game_start_record_slot_layouts():
+    """Test that slot records are split by version and cut at the end of the data."""
+    slots = bytes([2, 100, 2, 0, 1, 3, 0x04, 1, 90]) + bytes([0, 100, 2, 1, 1, 4, 0x08, 2, 80])
+    trailer = struct.pack("<I", 1) + b"\x03\x08"  # random seed, select mode, start spots
+    data = b"\x19" + struct.pack("<H", len(slots) + 7) + b"\x02" + slots + trailer
+
+    parsed, random_seed, select_mode, offset = parse_game_start_record(data, 0, 26)
+
+    assert parsed[0] == {
+        "player_id": 2,
+        "download_percent": 100,
+        "slot_status": 2,
+        "is_computer": False,
+        "team": 1,
+        "color": 3,
+        "race_flags": 0x04,
+        "ai_strength": 1,
+        "handicap": 90,
+    }
+    assert parsed[1]["is_computer"] is True
+    assert (random_seed, select_mode, offset) == (1, 3, len(data))
+
+    old_slots, *_ = parse_game_start_record(data[:4] + slots[:12], 0, 2)
+    assert [slot["handicap"] for slot in old_slots] == [100]
+    assert "ai_strength" not in old_slots[0]